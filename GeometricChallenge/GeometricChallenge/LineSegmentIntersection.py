@@ -1,28 +1,51 @@
+import functools
 import time
 import gcsolver
+import job_scheduler
+import shared_instances
+import solution_store
 
 
-def solve_instance(file, shuffle=True):
+# Runs passes shuffled passes on the instance, geometry is only built once for all passes
+# Returns the number of aborted passes, and the time it took
+def solve_shared_instance(instance: shared_instances.SharedInstance, shuffle=True, passes=1):
     start = time.perf_counter()
-    print(f"Starting {file}...")
-    gcsolver.solve("instances/" + file, shuffle=shuffle)
-    print(f"Solved {file} in {time.perf_counter() - start} seconds...")
+    print(f"Starting {instance.name}...")
+    with instance.attach() as g:
+        segments, bounding_box = gcsolver.prepare_segments(g)
 
+    # Only runs that beat the best known solution are worth finishing
+    max_colours = solution_store.get_store().best_score(instance.name) - 1
+    colours, aborted = gcsolver.run_passes(segments, bounding_box, passes, shuffle, max_colours)
+    if colours is not None:
+        gcsolver.save_solution(instance.name, colours)
 
-def solve_cg_challenge():
+    duration = time.perf_counter() - start
+    print(f"Solved {instance.name} in {duration} seconds, {aborted}/{passes} passes aborted early...")
+    return aborted, duration
+
+
+# Loads all instances into shared memory once, so workers do not have to read and parse the instance files
+def share_cg_challenge():
     from os import listdir
-    from multiprocessing import Pool
 
-    with Pool(8) as p:
-        instance_names = listdir("instances/")
-        p.map(solve_instance, instance_names)
-        p.close()
-        p.join()
+    shared = [shared_instances.share_instance("instances/" + file) for file in listdir("instances/")]
+    return [instance for instance, _ in shared], [shm for _, shm in shared]
 
 
-if __name__ == '__main__':
-    while True:
-        solve_cg_challenge()
+def solve_cg_challenge(instances, memory_budget=None, passes=1):
+    job_memory = [job_scheduler.estimate_job_memory(instance.num_edges) for instance in instances]
+    runs = job_scheduler.run_jobs(functools.partial(solve_shared_instance, passes=passes), instances, job_memory,
+                                  memory_budget=memory_budget)
 
+    print(f"{sum(aborted for aborted, _ in runs)}/{len(runs) * passes} passes aborted early "
+          f"in {sum(duration for _, duration in runs)} seconds.")
 
 
+if __name__ == '__main__':
+    instances, blocks = share_cg_challenge()
+    try:
+        while True:
+            solve_cg_challenge(instances)
+    finally:
+        shared_instances.release(blocks)
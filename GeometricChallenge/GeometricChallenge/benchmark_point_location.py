@@ -0,0 +1,77 @@
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from cgshop2022utils.io import read_instance  # Provided by the challenge
+import gcsolver
+import vertical_decomposition as vdclass
+
+
+# Shuffled first fit pass where every decomposition counts its point location steps
+# Returns the decompositions and the number of steps of every point location query
+def counted_pass(segments, bounding_box, seed):
+    steps = []
+
+    def new_vd():
+        vd = vdclass.VerticalDecomposition(bounding_box)
+        vd.query_hook = steps.append
+        return vd
+
+    random.seed(seed)
+    return gcsolver.decompose_segments(segments, bounding_box, True, new_decomposition=new_vd)[0], steps
+
+
+# Times locating every segment in the completed colour classes, before and after freezing them
+def benchmark_freeze(segments, bounding_box, seed):
+    vds = counted_pass(segments, bounding_box, seed)[0]
+    for vd in vds:
+        vd.query_hook = None
+
+    start = time.perf_counter()
+    for vd in vds:
+        for seg in segments:
+            vd.point_location_segment(seg)
+    dag_duration = time.perf_counter() - start
+
+    for vd in vds:
+        vd.freeze()
+
+    start = time.perf_counter()
+    for vd in vds:
+        for seg in segments:
+            vd.frozen.point_location_segment(seg)
+    frozen_duration = time.perf_counter() - start
+
+    # Memory of the classes (segments are shared and not counted)
+    tracemalloc.start()
+    vds = counted_pass(segments, bounding_box, seed)[0]
+    for vd in vds:
+        vd.query_hook = None
+    gc.collect()
+    dag_memory = tracemalloc.get_traced_memory()[0]
+    for vd in vds:
+        vd.freeze()
+    gc.collect()  # The DAG is full of reference cycles
+    frozen_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"  frozen: {dag_duration:.2f} seconds (dag) vs {frozen_duration:.2f} seconds (frozen) to locate all "
+          f"segments in {len(vds)} classes, {dag_memory / 1_000_000:.1f} MB (dag) vs "
+          f"{frozen_memory / 1_000_000:.1f} MB (frozen)")
+
+
+# Reports the point location steps of a first fit pass, and compares the DAG with the frozen decomposition
+# Usage: python benchmark_point_location.py <INSTANCE_NAME>
+if __name__ == '__main__':
+    instance_name = sys.argv[1] if len(sys.argv) > 1 else "rvisp3499"
+    g = read_instance(f"instances/{instance_name}.instance.json")["graph"]
+    segments, bounding_box = gcsolver.prepare_segments(g)
+
+    start = time.perf_counter()
+    vds, steps = counted_pass(segments, bounding_box, 0)
+    duration = time.perf_counter() - start
+    print(f"{len(vds)} colours in {duration:.2f} seconds, {len(steps)} queries, "
+          f"{sum(steps) / len(steps):.2f} steps per query, {max(steps)} worst")
+
+    benchmark_freeze(segments, bounding_box, 0)
@@ -0,0 +1,50 @@
+import random
+import sys
+import time
+from cgshop2022utils.io import read_instance  # Provided by the challenge
+import gcsolver
+import trapezoid as trapclass
+
+
+# Counts the trapezoids created and the walls built during a pass, by wrapping the Trapezoid methods
+def counted_pass(segments, bounding_box):
+    counts = {"trapezoids": 0, "walls": 0}
+    init = trapclass.Trapezoid.__init__
+    wall = trapclass.Trapezoid.wall
+
+    def counted_init(self, *args):
+        counts["trapezoids"] += 1
+        init(self, *args)
+
+    def counted_wall(self, x):
+        counts["walls"] += 1
+        return wall(self, x)
+
+    trapclass.Trapezoid.__init__ = counted_init
+    trapclass.Trapezoid.wall = counted_wall
+    try:
+        vds, _ = gcsolver.decompose_segments(segments, bounding_box, True)
+    finally:
+        trapclass.Trapezoid.__init__ = init
+        trapclass.Trapezoid.wall = wall
+    return vds, counts
+
+
+# Compares the number of trapezoids created with the number of walls built during a single pass
+# Usage: python benchmark_walls.py <INSTANCE_NAME>
+if __name__ == '__main__':
+    instance_name = sys.argv[1] if len(sys.argv) > 1 else "rvisp3499"
+    g = read_instance(f"instances/{instance_name}.instance.json")["graph"]
+    segments, bounding_box = gcsolver.prepare_segments(g)
+
+    random.seed(0)
+    start = time.perf_counter()
+    gcsolver.decompose_segments(segments, bounding_box, True)
+    duration = time.perf_counter() - start
+
+    random.seed(0)
+    vds, counts = counted_pass(segments, bounding_box)
+    live = sum(vd.statistics().trapezoids for vd in vds)
+    print(f"{instance_name}: {len(vds)} colours in {duration:.2f} seconds, {counts['trapezoids']} trapezoids created "
+          f"({live} in the final decompositions), {counts['walls']} of {2 * counts['trapezoids']} walls built "
+          f"({counts['walls'] / (2 * counts['trapezoids']):.1%})")
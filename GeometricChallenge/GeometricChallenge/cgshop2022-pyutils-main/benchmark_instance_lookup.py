@@ -0,0 +1,49 @@
+"""
+Measures the latency of looking up instance paths in an InstanceFileDatabase:
+a walk over the folder per lookup (as before the name index), building the index,
+loading the stored index, and lookups in the index.
+Usage: python benchmark_instance_lookup.py <INSTANCE_FOLDER>
+"""
+import os
+import sys
+import time
+from cgshop2022utils.instance_database.instance_file_database import InstanceFileDatabase, INDEX_FILE_NAME
+
+
+def walk_lookup(database, name):
+    for instance_path in database._iterate_paths():
+        if database._filename_fits_name(os.path.split(instance_path)[-1], name):
+            return instance_path
+    raise KeyError(name)
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else "../instances"
+    database = InstanceFileDatabase(folder)
+    names = [database._extract_instance_name_from_path(path) for path in database._iterate_paths()]
+
+    start = time.perf_counter()
+    for name in names:
+        walk_lookup(database, name)
+    walk_duration = time.perf_counter() - start
+
+    if os.path.exists(os.path.join(folder, INDEX_FILE_NAME)):
+        os.remove(os.path.join(folder, INDEX_FILE_NAME))
+    start = time.perf_counter()
+    InstanceFileDatabase(folder)._find_path(names[0])
+    build_duration = time.perf_counter() - start
+
+    database = InstanceFileDatabase(folder)
+    start = time.perf_counter()
+    database._find_path(names[0])
+    load_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in names:
+        database._find_path(name)
+    index_duration = time.perf_counter() - start
+
+    print(f"{len(names)} instances in {folder}:")
+    print(f"  walk per lookup: {walk_duration / len(names) * 1e6:.1f} us per lookup")
+    print(f"  index: built in {build_duration * 1e3:.2f} ms, loaded in {load_duration * 1e3:.2f} ms, "
+          f"{index_duration / len(names) * 1e6:.1f} us per lookup")
@@ -0,0 +1,39 @@
+"""
+Measures the pure Python verifier (and the C++ extension, if it is available) on a single
+colour class of disjoint segments. The segments lie in horizontal bands with random x-ranges,
+so a large part of them crosses the sweep line at the same time.
+Usage: python benchmark_python_verifier.py [NUMBER_OF_SEGMENTS ...]
+"""
+import random
+import sys
+import time
+import cgshop2022utils.verify.python_verifier as pyv
+
+
+def disjoint_segments(n: int):
+    rng = random.Random(0)
+    segments = []
+    for i in range(n):
+        x = rng.randrange(1_000_000)
+        segments.append(((x, 2 * i), (x + rng.randrange(1, 1_000_000), 2 * i + 1)))
+    return segments
+
+
+if __name__ == "__main__":
+    try:
+        import cgshop2022utils.verify.coloring_verifier as extension
+    except ImportError:
+        extension = None
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 50_000, 200_000]
+    for n in sizes:
+        segments = disjoint_segments(n)
+        start = time.perf_counter()
+        error, _ = pyv.verify_coloring(segments, [0] * n)
+        duration = time.perf_counter() - start
+        assert error is None
+        line = f"{n} segments: python {duration:.2f} s"
+        if extension is not None:
+            start = time.perf_counter()
+            extension.verify_coloring(segments, [0] * n)
+            line += f", C++ {time.perf_counter() - start:.2f} s"
+        print(line)
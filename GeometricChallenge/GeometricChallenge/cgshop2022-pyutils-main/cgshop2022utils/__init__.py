@@ -3,4 +3,5 @@ from . import verify
 
 from .instance_database import InstanceDatabase
 from .zip.zip_processor import ZipSolutionIterator
+from .zip.zip_verifier import ZipSolutionVerifier
 from .zip.zip_reader_errors import *
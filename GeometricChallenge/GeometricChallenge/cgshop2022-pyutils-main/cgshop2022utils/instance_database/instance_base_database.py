@@ -2,6 +2,9 @@ import os, abc
 import typing
 
 from cgshop2022utils.io import read_solution, read_instance
+from .instance_cache import InstanceCache
+
+DEFAULT_CACHE_SIZE_LIMIT = 2000 * 1_000_000
 
 
 class InstanceBaseDatabase(abc.ABC):
@@ -9,7 +12,7 @@ class InstanceBaseDatabase(abc.ABC):
     This class is only an ABC for lower level access classes.
     """
 
-    def __init__(self, path: str, enable_cache: bool = False):
+    def __init__(self, path: str, enable_cache: bool = False, cache_size_limit: int = DEFAULT_CACHE_SIZE_LIMIT):
         """
         Create an InstanceDatabase that searches in a specified folder for instances.
         :param path: Path to the folder that contains the instance files (e.g. the folder
@@ -17,10 +20,12 @@ class InstanceBaseDatabase(abc.ABC):
                         in subfolders but have the names have to be NAME.instance.json.
         :param enable_cache: Should the loaded instances be cached? This can take quite
                         a lot of memory
+        :param cache_size_limit: Approximate memory (in bytes) the cached instances may take,
+                        the least recently used instances are evicted first.
         """
         self._path = path
         self._is_cache_enabled = enable_cache
-        self._cache = {}
+        self._cache = InstanceCache(cache_size_limit if enable_cache else 0)
         if not os.path.exists(path):
             raise ValueError(f"The folder {os.path.abspath(path)} does not exist")
 
@@ -39,9 +44,21 @@ class InstanceBaseDatabase(abc.ABC):
     def read(self, f):
         return read_instance(f)
 
-    def _cache_and_return(self, instance):
+    @property
+    def cache(self) -> InstanceCache:
+        """
+        The instance cache, with its hit/miss/eviction counters.
+        """
+        return self._cache
+
+    def _cached(self, name):
+        if not self._is_cache_enabled:
+            return None
+        return self._cache.get(name)
+
+    def _cache_and_return(self, name, instance):
         if self._is_cache_enabled:
-            self._cache[instance.name] = instance
+            self._cache.put(name, instance)
         return instance
 
     def _is_hidden_folder_name(self, name):
@@ -58,6 +75,14 @@ class InstanceBaseDatabase(abc.ABC):
         filename = os.path.split(path)[1]
         return filename.split(".")[0]
 
+    @abc.abstractmethod
+    def _instance_entries(self) -> typing.List[typing.Tuple[str, typing.Tuple, int]]:
+        """
+        All instances in database order, as (name, reader, size in bytes), where reader is a
+        picklable (function, *arguments) tuple that reads the instance.
+        """
+        pass
+
     @abc.abstractmethod
     def __iter__(self) -> typing.Dict:
         """
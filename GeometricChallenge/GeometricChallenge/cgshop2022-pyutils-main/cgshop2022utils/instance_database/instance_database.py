@@ -3,6 +3,9 @@ import typing
 
 from .instance_file_database import InstanceFileDatabase
 from .instance_zip_database import InstanceZipDatabase
+from .instance_base_database import DEFAULT_CACHE_SIZE_LIMIT
+from .instance_cache import InstanceCache
+from .prefetch import prefetch_instances
 from ..io import read_solution
 
 
@@ -13,7 +16,7 @@ class InstanceDatabase:
     but no symbolic links.
     """
 
-    def __init__(self, path: str, enable_cache: bool = False):
+    def __init__(self, path: str, enable_cache: bool = False, cache_size_limit: int = DEFAULT_CACHE_SIZE_LIMIT):
         """
         Create an InstanceDatabase that searches in a specified folder/zipfile for instances.
         :param path: Path to the folder/zipfile that contains the instance files (e.g. the folder
@@ -21,21 +24,38 @@ class InstanceDatabase:
                         in subfolders but have the names have to be NAME.instance.json.
         :param enable_cache: Should the loaded instances be cached? This can take quite
                         a lot of memory
+        :param cache_size_limit: Approximate memory (in bytes) the cached instances may take,
+                        the least recently used instances are evicted first.
         """
-        self._inner_database = self._guess_database_class(path, enable_cache)
+        self._inner_database = self._guess_database_class(path, enable_cache, cache_size_limit)
 
-    def _guess_database_class(self, path: str, enable_cache):
+    @property
+    def path(self) -> str:
+        """
+        The path of the folder/zipfile that contains the instances.
+        """
+        return self._inner_database._path
+
+    @property
+    def cache(self) -> InstanceCache:
+        """
+        The instance cache, with its hit/miss/eviction counters.
+        """
+        return self._inner_database.cache
+
+    def _guess_database_class(self, path: str, enable_cache, cache_size_limit):
         """
         Guess if the path contains a zipfile or a folder that could contain the database
         :param path: Path to the folder/zipfile
         :param enable_cache: Cache instances or read from file/zip
+        :param cache_size_limit: Approximate memory (in bytes) the cached instances may take
         :return: Guessed database object
         """
         if os.path.isdir(path):
-            return InstanceFileDatabase(path, enable_cache=enable_cache)
+            return InstanceFileDatabase(path, enable_cache=enable_cache, cache_size_limit=cache_size_limit)
         elif os.path.isfile(path):
             if zipfile.is_zipfile(path):
-                return InstanceZipDatabase(path, enable_cache=enable_cache)
+                return InstanceZipDatabase(path, enable_cache=enable_cache, cache_size_limit=cache_size_limit)
             else:
                 raise FileNotFoundError(f"{path} is neither a directory or a zipfile.")
         raise FileNotFoundError("{path} not found".format(path=path))
@@ -48,6 +68,23 @@ class InstanceDatabase:
         for instance in self._inner_database:
             yield instance
 
+    def prefetch(self, prefetch: int = 4, workers: typing.Optional[int] = None, largest_first: bool = False,
+                 use_processes: bool = False) -> typing.Iterator[typing.Dict]:
+        """
+        Iterate over all instances in database while the next instances are read in the background.
+        e.g.,
+        ```
+        for instance in InstanceDatabase("./instances").prefetch(largest_first=True):
+            solve(instance)
+        ```
+        :param prefetch: Maximal number of instances that are read ahead.
+        :param workers: Number of threads/processes that read instances (default: prefetch).
+        :param largest_first: Iterate in order of decreasing file size.
+        :param use_processes: Parse in processes instead of threads.
+        :return: Instance objects
+        """
+        return prefetch_instances(self._inner_database, prefetch, workers, largest_first, use_processes)
+
     def __getitem__(self, name: str) -> typing.Dict:
         """
         Returns the instance of a specific name or throws an KeyError.
@@ -1,16 +1,28 @@
+import json
 import os
 import typing
 
-from .instance_base_database import InstanceBaseDatabase
+from .instance_base_database import InstanceBaseDatabase, DEFAULT_CACHE_SIZE_LIMIT
+from .prefetch import _read_file
+
+INDEX_FILE_NAME = ".instance_index.json"
+INDEX_VERSION = 1
+
 
 class InstanceFileDatabase(InstanceBaseDatabase):
     """
     This class allows to easily read instances from a folder if the instance files
     follow the naming convention 'instance-name.instance.json'. It allows subfolder
     but no symbolic links.
+    Lookups use an index from instance names to paths, which is built by a single walk
+    over the folder and stored in the folder (if it is writable) together with the
+    modification times of all subfolders. A lookup only checks that the file still exists;
+    when a name is not found, the index is rebuilt if a subfolder changed since it was built,
+    i.e., an instance file was added, removed or renamed.
     """
 
-    def __init__(self, path: str, enable_cache: bool = False):
+    def __init__(self, path: str, enable_cache: bool = False, persist_index: bool = True,
+                 cache_size_limit: int = DEFAULT_CACHE_SIZE_LIMIT):
         """
         Create an InstanceDatabase that searches in a specified folder for instances.
         :param path: Path to the folder that contains the instance files (e.g. the folder
@@ -18,8 +30,13 @@ class InstanceFileDatabase(InstanceBaseDatabase):
                         in subfolders but have the names have to be NAME.instance.json.
         :param enable_cache: Should the loaded instances be cached? This can take quite
                         a lot of memory
+        :param persist_index: Should the name index be stored in (and loaded from) the folder?
+        :param cache_size_limit: Approximate memory (in bytes) the cached instances may take.
         """
-        super().__init__(path, enable_cache)
+        super().__init__(path, enable_cache, cache_size_limit)
+        self._persist_index = persist_index
+        self._index = None  # instance name -> path
+        self._directory_mtimes = None  # folder -> modification time (ns) when the index was built
 
     def _iterate_paths(self):
         for root, dirs, files in os.walk(self._path, topdown=True):
@@ -29,16 +46,83 @@ class InstanceFileDatabase(InstanceBaseDatabase):
                     path = os.path.join(root, file)
                     yield path
 
+    def _index_path(self):
+        return os.path.join(self._path, INDEX_FILE_NAME)
+
+    def _is_index_valid(self) -> bool:
+        try:
+            return all(os.stat(directory).st_mtime_ns == mtime
+                       for directory, mtime in self._directory_mtimes.items())
+        except OSError:
+            return False
+
+    def _build_index(self):
+        if self._persist_index:
+            # creating the index file changes the modification time of the folder, so it is created before the walk
+            # and only rewritten in place afterwards
+            try:
+                open(self._index_path(), "a").close()
+            except OSError:
+                pass
+        index = {}
+        directory_mtimes = {}
+        for root, dirs, files in os.walk(self._path, topdown=True):
+            dirs[:] = [d for d in dirs if not self._is_hidden_folder(d)]
+            directory_mtimes[os.path.normpath(root)] = os.stat(root).st_mtime_ns
+            for file in files:
+                if self._filename_fits_instance_convention(file) and not self._is_hidden_folder_name(file):
+                    # the first file in walk order wins, as in a walk for a single name
+                    index.setdefault(self._extract_instance_name_from_path(file), os.path.join(root, file))
+        self._index = index
+        self._directory_mtimes = directory_mtimes
+        if self._persist_index:
+            self._store_index()
+
+    def _store_index(self):
+        # paths are stored relative to the folder, the database may be opened from another working directory
+        data = {"version": INDEX_VERSION,
+                "directories": {os.path.relpath(d, self._path): m for d, m in self._directory_mtimes.items()},
+                "instances": {n: os.path.relpath(p, self._path) for n, p in self._index.items()}}
+        try:
+            # a reader that sees a partially written index rebuilds it
+            with open(self._index_path(), "w") as index_file:
+                json.dump(data, index_file)
+        except OSError:
+            pass  # read-only folder: the index only lives in memory
+
+    def _load_index(self) -> bool:
+        try:
+            with open(self._index_path(), "r") as index_file:
+                data = json.load(index_file)
+            if data["version"] != INDEX_VERSION:
+                return False
+            self._directory_mtimes = {os.path.normpath(os.path.join(self._path, d)): m
+                                      for d, m in data["directories"].items()}
+            self._index = {n: os.path.join(self._path, p) for n, p in data["instances"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+        return self._is_index_valid()
+
     def _find_path(self, name):
-        for instance_path in self._iterate_paths():
-            if self._filename_fits_name(os.path.split(instance_path)[-1], name):
-                return instance_path
-        raise KeyError(f"Did not find a suitable file for {name} in {self._path}")
+        if self._index is None and not (self._persist_index and self._load_index()):
+            self._build_index()
+        path = self._index.get(name)
+        # a miss only walks the folder again if one of the subfolders changed
+        if (path is None and not self._is_index_valid()) or (path is not None and not os.path.isfile(path)):
+            self._build_index()
+            path = self._index.get(name)
+        if path is None:
+            raise KeyError(f"Did not find a suitable file for {name} in {self._path}")
+        return path
 
     def _extract_instance_name_from_path(self, path):
         filename = os.path.split(path)[1]
         return filename.split(".")[0]
 
+    def _instance_entries(self):
+        return [(self._extract_instance_name_from_path(path), (_read_file, path), os.path.getsize(path))
+                for path in self._iterate_paths()]
+
     def __iter__(self) -> typing.Dict:
         """
         Iterate over all instance files.
@@ -46,10 +130,11 @@ class InstanceFileDatabase(InstanceBaseDatabase):
         """
         for instance_path in self._iterate_paths():
             instance_name = self._extract_instance_name_from_path(instance_path)
-            if instance_name in self._cache:
-                yield self._cache[instance_name]
+            instance = self._cached(instance_name)
+            if instance is not None:
+                yield instance
             else:
-                yield self._cache_and_return(self.read(instance_path))
+                yield self._cache_and_return(instance_name, self.read(instance_path))
 
     def __getitem__(self, name: str) -> typing.Dict:
         """
@@ -57,7 +142,8 @@ class InstanceFileDatabase(InstanceBaseDatabase):
         :param name: Name of the instance.
         :return:
         """
-        if name is self._cache:
-            return self._cache[name]
+        instance = self._cached(name)
+        if instance is not None:
+            return instance
         path = self._find_path(name)
-        return self._cache_and_return(self.read(path))
+        return self._cache_and_return(name, self.read(path))
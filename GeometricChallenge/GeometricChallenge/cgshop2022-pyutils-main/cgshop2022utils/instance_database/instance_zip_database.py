@@ -1,7 +1,8 @@
 import os, zipfile
 import typing
 
-from .instance_base_database import InstanceBaseDatabase
+from .instance_base_database import InstanceBaseDatabase, DEFAULT_CACHE_SIZE_LIMIT
+from .prefetch import _read_zip_member
 
 
 class InstanceZipDatabase(InstanceBaseDatabase):
@@ -11,7 +12,7 @@ class InstanceZipDatabase(InstanceBaseDatabase):
     but no symbolic links.
     """
 
-    def __init__(self, path: str, enable_cache: bool = False):
+    def __init__(self, path: str, enable_cache: bool = False, cache_size_limit: int = DEFAULT_CACHE_SIZE_LIMIT):
         """
         Create an InstanceDatabase that searches in a specified zipfile for instances.
         :param path: Path to the zipfile that contains the instance files.
@@ -19,9 +20,10 @@ class InstanceZipDatabase(InstanceBaseDatabase):
                         NAME.instance.json.
         :param enable_cache: Should the loaded instances be cached? This can take quite
                         a lot of memory
+        :param cache_size_limit: Approximate memory (in bytes) the cached instances may take.
         """
 
-        super().__init__(path, enable_cache)
+        super().__init__(path, enable_cache, cache_size_limit)
         self._zipfile = zipfile.ZipFile(path)
 
     def _find_path(self, name):
@@ -30,6 +32,13 @@ class InstanceZipDatabase(InstanceBaseDatabase):
                 return instance_path
         raise KeyError(f"Did not find a suitable file for {name} in {self._path}")
 
+    def _instance_entries(self):
+        return [(self._extract_instance_name_from_path(file_data.filename),
+                 (_read_zip_member, self._zipfile.filename, file_data.filename), file_data.file_size)
+                for file_data in self._zipfile.filelist
+                if self._filename_fits_instance_convention(file_data.filename)
+                and not self._is_hidden_folder(file_data.filename)]
+
     def __iter__(self) -> typing.Dict:
         """
         Iterate over all instance files.
@@ -40,11 +49,12 @@ class InstanceZipDatabase(InstanceBaseDatabase):
                     file_data.filename) and not self._is_hidden_folder(
                 file_data.filename):
                 instance_name = self._extract_instance_name_from_path(file_data.filename)
-                try:
-                    yield self._cache[instance_name]
-                except KeyError:
+                instance = self._cached(instance_name)
+                if instance is not None:
+                    yield instance
+                else:
                     yield self._cache_and_return(
-                        self.read(self._zipfile.open(file_data.filename)))
+                        instance_name, self.read(self._zipfile.open(file_data.filename)))
 
     def __getitem__(self, name: str) -> typing.Dict:
         """
@@ -52,9 +62,9 @@ class InstanceZipDatabase(InstanceBaseDatabase):
         :param name: Name of the instance.
         :return:
         """
-        try:
-            return self._cache[name]
-        except KeyError:
-            path = self._find_path(name)
-            return self._cache_and_return(
-                self.read(self._zipfile.open(path)))
+        instance = self._cached(name)
+        if instance is not None:
+            return instance
+        path = self._find_path(name)
+        return self._cache_and_return(
+            name, self.read(self._zipfile.open(path)))
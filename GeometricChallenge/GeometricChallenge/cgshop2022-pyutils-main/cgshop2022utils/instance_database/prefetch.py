@@ -0,0 +1,62 @@
+import collections
+import typing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from cgshop2022utils.io import read_instance
+from cgshop2022utils.io.zip_handles import zip_reading_executor, open_zip
+
+
+def _read_file(path: str) -> typing.Dict:
+    return read_instance(path)
+
+
+def _read_zip_member(zip_path: str, member: str) -> typing.Dict:
+    with open_zip(zip_path) as zip_file, zip_file.open(member) as f:
+        return read_instance(f)
+
+
+def prefetch_instances(database, prefetch: int = 4, workers: typing.Optional[int] = None,
+                       largest_first: bool = False, use_processes: bool = False) -> typing.Iterator[typing.Dict]:
+    """
+    Iterates over all instances of the database while the next instances are read and parsed
+    in the background, so reading overlaps with the work of the consumer.
+    :param database: An InstanceFileDatabase or InstanceZipDatabase.
+    :param prefetch: Maximal number of instances that are read ahead of the consumer.
+    :param workers: Number of threads/processes that read instances (default: prefetch).
+    :param largest_first: Iterate in order of decreasing file size instead of the order of
+                    the database, e.g., to start the longest jobs first.
+    :param use_processes: Parse in processes instead of threads; parsing the JSON holds the GIL,
+                    but the instances have to be sent back to this process.
+    :return: Instance objects
+    """
+    entries = database._instance_entries()
+    if largest_first:
+        entries.sort(key=lambda entry: entry[2], reverse=True)
+    prefetch = max(1, prefetch)
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with zip_reading_executor(executor_class, workers or prefetch) as executor:
+        in_flight = collections.deque()
+        try:
+            for (name, reader, _) in entries:
+                # Instances in the cache are not read again, the cache is only used from this thread
+                future = None if name in database.cache else executor.submit(*reader)
+                in_flight.append((name, reader, future))
+                # the next read is submitted before the oldest instance is handed out
+                if len(in_flight) > prefetch:
+                    yield _prefetched(database, *in_flight.popleft())
+            while in_flight:
+                yield _prefetched(database, *in_flight.popleft())
+        finally:
+            for (_, _, future) in in_flight:
+                if future is not None:
+                    future.cancel()
+
+
+def _prefetched(database, name, reader, future) -> typing.Dict:
+    if future is None:
+        instance = database._cached(name)
+        if instance is not None:
+            return instance
+        # evicted in the meantime
+        return database._cache_and_return(name, reader[0](*reader[1:]))
+    return database._cache_and_return(name, future.result())
@@ -0,0 +1,56 @@
+"""
+Zip file handles for the workers of an executor. Every worker thread (or process) opens a zip
+once and reuses the handle for all members it reads, instead of parsing the central directory
+of the zip for every member.
+"""
+import contextlib
+import threading
+import typing
+from zipfile import ZipFile
+
+# The zip file handles of a worker thread or process
+_worker_state = threading.local()
+
+
+def _init_zip_worker(handles: typing.List[ZipFile]):
+    # with threads, handles is the list of the executor and the handles are closed on shutdown;
+    # a worker process gets a copy, its handles are closed when the process exits on shutdown
+    _worker_state.handles = handles
+    _worker_state.by_path = {}
+
+
+@contextlib.contextmanager
+def zip_reading_executor(executor_class, workers: typing.Optional[int]):
+    """
+    Creates an executor whose workers can read zips with open_zip. The zip file handles
+    of the workers are closed when the executor shuts down.
+    :param executor_class: ThreadPoolExecutor or ProcessPoolExecutor
+    :param workers: Number of workers
+    :return: The executor
+    """
+    handles = []
+    try:
+        with executor_class(workers, initializer=_init_zip_worker, initargs=(handles,)) as executor:
+            yield executor
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+@contextlib.contextmanager
+def open_zip(path: str) -> typing.Iterator[ZipFile]:
+    """
+    Returns the zip file handle of the current worker of a zip_reading_executor for the path.
+    Outside such a worker, the zip is opened and closed again.
+    :param path: Path of the zip
+    :return: The ZipFile, which must not be closed by the caller
+    """
+    by_path = getattr(_worker_state, "by_path", None)
+    if by_path is None:
+        with ZipFile(path) as zip_file:
+            yield zip_file
+        return
+    if path not in by_path:
+        by_path[path] = ZipFile(path)
+        _worker_state.handles.append(by_path[path])
+    yield by_path[path]
@@ -1,12 +1,14 @@
 try:
     from .coloring_verifier import Point, Segment, ColoringError,\
                                    do_intersect as _do_intersect, verify_coloring as _verify_coloring
+    BACKEND = "c++"
 except ModuleNotFoundError:
     import warnings
-    warnings.warn("Could not import C++ extension for verification of colorings; verifying colorings will fail."\
-                  "To verify colorings, please perform a proper installation of the cgshop2022utils package.")
-    pass
-
+    warnings.warn("Could not import C++ extension for verification of colorings; using the (much slower) pure Python "\
+                  "verifier instead. For fast verification, please perform a proper installation of the cgshop2022utils package.")
+    from .python_verifier import Point, Segment, ColoringError,\
+                                 do_intersect as _do_intersect, verify_coloring as _verify_coloring
+    BACKEND = "python"
 
 import typing as _t
 import networkx as _nx
@@ -0,0 +1,444 @@
+"""
+Pure Python implementation of the coloring verifier.
+
+It exposes the same classes (Point, Segment, ColoringError) and functions
+(verify_coloring, do_intersect) as the C++ extension coloring_verifier and
+gives the same results; it is used when the extension is not available.
+Coordinates are Python integers, so all predicates are exact.
+"""
+
+import typing as _t
+
+_NPOS = 2 ** 64 - 1  # std::size_t(-1), used by the C++ verifier for errors that do not concern a segment
+
+
+def _fmt(value: float) -> str:
+    # Formats a double like a C++ output stream does (6 significant digits)
+    return f"{value:g}"
+
+
+class Point:
+    """
+    Represents a point with integer coordinates.
+    """
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: int, y: int):
+        self.x = x
+        self.y = y
+
+    def _key(self):
+        return self.x, self.y
+
+    def __lt__(self, other: "Point") -> bool:
+        return self._key() < other._key()
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Point) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __str__(self):
+        return f"({self.x}, {self.y})"
+
+    def __repr__(self):
+        return f"Point({self.x}, {self.y})"
+
+
+class Segment:
+    """
+    Represents a line segment defined by two points with integer coordinates.
+    """
+
+    __slots__ = ("s", "t")
+
+    def __init__(self, s: Point, t: Point):
+        self.s = s
+        self.t = t
+
+    def ordered(self) -> "Segment":
+        """
+        Return the segment with its lexicographically smaller end point as s.
+        """
+        if self.s < self.t:
+            return self
+        return Segment(self.t, self.s)
+
+    def __str__(self):
+        return f"{self.s}--{self.t}"
+
+    def __repr__(self):
+        return f"Segment(({self.s.x}, {self.s.y}), ({self.t.x}, {self.t.y}))"
+
+
+class ColoringError:
+    """
+    An error in a coloring; either an error in the encoding (is_intersection is false),
+    or a pair of intersecting segments (is_intersection is true), in which case the
+    segment indices, the color class and the approximate location of the intersection
+    are valid. The message always describes the error.
+    """
+
+    __slots__ = ("segment_index1", "segment_index2", "color_class", "approximate_x", "approximate_y",
+                 "message", "is_intersection")
+
+    def __init__(self, segment_index1: int, segment_index2: int, color_class: int,
+                 approximate_x: float, approximate_y: float, message: str, is_intersection: bool):
+        self.segment_index1 = segment_index1
+        self.segment_index2 = segment_index2
+        self.color_class = color_class
+        self.approximate_x = approximate_x
+        self.approximate_y = approximate_y
+        self.message = message
+        self.is_intersection = is_intersection
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"ColoringError({self.segment_index1}, {self.segment_index2}, {self.color_class}, " \
+               f"{_fmt(self.approximate_x)}, {_fmt(self.approximate_y)}, \"{self.message}\", " \
+               f"{str(self.is_intersection).lower()})"
+
+
+# Segments are handled as tuples (sx, sy, tx, ty) with (sx, sy) < (tx, ty) internally.
+
+def _orientation(p1x, p1y, p2x, p2y, p3x, p3y) -> int:
+    # 0: collinear, 1: counterclockwise turn, -1: clockwise turn
+    v1 = (p2y - p1y) * (p3x - p2x)
+    v2 = (p2x - p1x) * (p3y - p2y)
+    if v1 == v2:
+        return 0
+    return -1 if v1 > v2 else 1
+
+
+def _collinear_order_correct(p1x, p1y, p2x, p2y, p3x, p3y) -> bool:
+    if p1x == p2x:
+        return p3y <= p2y if p1y > p2y else p2y <= p3y
+    if p1x < p2x:
+        return p2x <= p3x
+    return p3x <= p2x
+
+
+def _ranges_overlap(min1, max1, min2, max2) -> bool:
+    if min1 < min2:
+        return max1 >= min2
+    return max2 >= min1
+
+
+def _approximate_intersection_point(s1, s2) -> _t.List[float]:
+    psx, psy, ptx, pty = s1
+    qsx, qsy, qtx, qty = s2
+    rx, ry = ptx - psx, pty - psy
+    sx, sy = qtx - qsx, qty - qsy
+    qmpx, qmpy = qsx - psx, qsy - psy
+    qpr = qmpx * ry - rx * qmpy
+    rs = rx * sy - sx * ry
+    if not qpr and not rs:  # collinear
+        if _collinear_order_correct(psx, psy, qsx, qsy, ptx, pty):
+            return [float(qsx), float(qsy)]
+        if _collinear_order_correct(psx, psy, qtx, qty, ptx, pty):
+            return [float(qtx), float(qty)]
+        if _collinear_order_correct(qsx, qsy, psx, psy, qtx, qty):
+            return [float(psx), float(psy)]
+        if _collinear_order_correct(psx, psy, ptx, pty, qtx, qty):
+            return [float(ptx), float(pty)]
+        raise RuntimeError("Overlap check positive, but no overlap!")
+    if not rs:
+        raise RuntimeError("Intersection check positive, but no intersection!")
+    u = float(qpr) / float(rs)
+    return [qsx + u * sx, qsy + u * sy]
+
+
+def _do_intersect(s1, s2) -> _t.Optional[_t.List[float]]:
+    # Both segments must be ordered; returns an approximate intersection point or None
+    if (s2[0], s2[1]) < (s1[0], s1[1]):
+        s1, s2 = s2, s1
+    s1sx, s1sy, s1tx, s1ty = s1
+    s2sx, s2sy, s2tx, s2ty = s2
+    if s1sx == s2sx and s1sy == s2sy:
+        if not _orientation(s1sx, s1sy, s1tx, s1ty, s2tx, s2ty):
+            if _collinear_order_correct(s1sx, s1sy, s1tx, s1ty, s2tx, s2ty):
+                return [float(s1tx), float(s1ty)]
+            return [float(s2tx), float(s2ty)]
+        return None
+    if s1tx == s2tx and s1ty == s2ty:
+        if not _orientation(s1sx, s1sy, s2sx, s2sy, s1tx, s1ty):
+            return [float(s2sx), float(s2sy)]
+        return None
+    if s1tx == s2sx and s1ty == s2sy:
+        return None
+    o1 = _orientation(s1sx, s1sy, s1tx, s1ty, s2sx, s2sy)
+    o2 = _orientation(s1sx, s1sy, s1tx, s1ty, s2tx, s2ty)
+    o3 = _orientation(s2sx, s2sy, s2tx, s2ty, s1sx, s1sy)
+    o4 = _orientation(s2sx, s2sy, s2tx, s2ty, s1tx, s1ty)
+    if o1 != o2 and o3 != o4:  # general case
+        return _approximate_intersection_point(s1, s2)
+    if not o1 and not o2:  # all collinear
+        if _ranges_overlap(min(s1sx, s1tx), max(s1sx, s1tx), min(s2sx, s2tx), max(s2sx, s2tx)) and \
+                _ranges_overlap(min(s1sy, s1ty), max(s1sy, s1ty), min(s2sy, s2ty), max(s2sy, s2ty)):
+            return _approximate_intersection_point(s1, s2)
+    return None
+
+
+def do_intersect(s1: Segment, s2: Segment) -> _t.Optional[_t.List[float]]:
+    """
+    Do the given segments intersect? If yes, an approximate intersection point is returned.
+    Both s1 and s2 must have s <= t.
+    """
+    return _do_intersect((s1.s.x, s1.s.y, s1.t.x, s1.t.y), (s2.s.x, s2.s.y, s2.t.x, s2.t.y))
+
+
+class _Intersection(Exception):
+    # Raised by the sweep as soon as an intersection between segments i and j is found
+    def __init__(self, i: int, j: int, location: _t.List[float]):
+        super().__init__()
+        self.segment_index = (i, j)
+        self.approximate_location = location
+
+
+class _Block:
+    # A run of consecutive segments of the sweep line, linked to the runs below and above it
+    __slots__ = ("items", "below", "above")
+
+    def __init__(self, items: _t.List[int], below: "_Block" = None, above: "_Block" = None):
+        self.items = items
+        self.below = below
+        self.above = above
+
+
+class _SweepLine:
+    """
+    The segments crossed by the sweep line, ordered from bottom to top, as a list of blocks
+    of at most 2 * _SweepLine.BLOCK_SIZE segments. A segment is placed with a binary search
+    over the first segments of the blocks and then within its block, and removed through
+    the block it is in, so no operation scans more than a block.
+    """
+
+    BLOCK_SIZE = 256
+
+    def __init__(self):
+        self.blocks = []  # type: _t.List[_Block]
+        self.block_of = {}  # segment -> its block
+
+    def insert(self, index: int, less) -> _t.Tuple[_t.Optional[int], _t.Optional[int]]:
+        """
+        Inserts the segment, where less(index, other) tells if it lies below an active segment.
+        :return: The segments directly below and above it (None if there is none).
+        """
+        blocks = self.blocks
+        if not blocks:
+            block = _Block([index])
+            blocks.append(block)
+            self.block_of[index] = block
+            return None, None
+        low, high = 1, len(blocks)
+        while low < high:
+            middle = (low + high) // 2
+            if less(index, blocks[middle].items[0]):
+                high = middle
+            else:
+                low = middle + 1
+        block = blocks[low - 1]
+        items = block.items
+        low, high = 0, len(items)
+        while low < high:
+            middle = (low + high) // 2
+            if less(index, items[middle]):
+                high = middle
+            else:
+                low = middle + 1
+        items.insert(low, index)
+        self.block_of[index] = block
+        below = items[low - 1] if low > 0 else (block.below.items[-1] if block.below is not None else None)
+        above = items[low + 1] if low + 1 < len(items) else (block.above.items[0] if block.above is not None else None)
+        if len(items) > 2 * self.BLOCK_SIZE:
+            self._split(block)
+        return below, above
+
+    def remove(self, index: int) -> _t.Tuple[_t.Optional[int], _t.Optional[int]]:
+        """
+        Removes the segment.
+        :return: The segments that were directly below and above it (None if there is none).
+        """
+        block = self.block_of.pop(index)
+        items = block.items
+        position = items.index(index)
+        below = items[position - 1] if position > 0 else (block.below.items[-1] if block.below is not None else None)
+        above = items[position + 1] if position + 1 < len(items) \
+            else (block.above.items[0] if block.above is not None else None)
+        del items[position]
+        if not items:
+            self._unlink(block)
+        return below, above
+
+    def _position(self, block: _Block) -> int:
+        # Blocks are only created and dropped once per BLOCK_SIZE segments, so a scan is fine
+        return next(i for i, other in enumerate(self.blocks) if other is block)
+
+    def _split(self, block: _Block):
+        upper = _Block(block.items[self.BLOCK_SIZE:], block, block.above)
+        del block.items[self.BLOCK_SIZE:]
+        if block.above is not None:
+            block.above.below = upper
+        block.above = upper
+        for index in upper.items:
+            self.block_of[index] = upper
+        self.blocks.insert(self._position(block) + 1, upper)
+
+    def _unlink(self, block: _Block):
+        if block.below is not None:
+            block.below.above = block.above
+        if block.above is not None:
+            block.above.below = block.below
+        del self.blocks[self._position(block)]
+
+
+class _AnyIntersectionSweep:
+    """
+    Sweep-line algorithm that determines whether a set of (ordered) segments contains
+    a pair of intersecting segments, without approximation; same algorithm as the C++
+    verifier, with a _SweepLine of sorted blocks instead of a skip list.
+    Segments are only counted as intersecting if they share a point that is not an
+    endpoint for at least one of them.
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+
+    def _set_intersection(self, si1: int, si2: int):
+        loc = _approximate_intersection_point(self.segments[si1], self.segments[si2])
+        raise _Intersection(si1, si2, loc)
+
+    def _compare_less_at_x_1vert(self, si1, si2, s1, s2) -> bool:
+        # s1 is vertical; either of the two segments can be the newly inserted segment
+        if s2[0] == s1[0]:
+            if s2[1] <= s1[1]:
+                return False
+            self._set_intersection(si1, si2)
+        delta_x_2 = s2[2] - s2[0]
+        delta_y_2 = s2[3] - s2[1]
+        lhs = (s1[0] - s2[0]) * delta_y_2
+        rhs_bot = delta_x_2 * (s1[1] - s2[1])
+        rhs_top = delta_x_2 * (s1[3] - s2[1])
+        if lhs > rhs_top:
+            return True
+        if lhs < rhs_bot:
+            return False
+        if s2[2] == s1[2] and s2[3] == s1[3]:
+            return True
+        self._set_intersection(si1, si2)
+
+    def _compare_less_at_x_novert(self, si1, si2, s1, s2) -> bool:
+        # s1 is the newly inserted segment, neither segment is vertical
+        if s2[0] == s1[0]:
+            if s1[1] > s2[1]:
+                return False
+            # same start point: order by incline
+            lhs = (s1[3] - s1[1]) * (s2[2] - s2[0])
+            rhs = (s2[3] - s2[1]) * (s1[2] - s1[0])
+            if lhs < rhs:
+                return True
+            if rhs < lhs:
+                return False
+            # overlap
+            self._set_intersection(si1, si2)
+        lhs = (s1[0] - s2[0]) * (s2[3] - s2[1])
+        rhs = (s2[2] - s2[0]) * (s1[1] - s2[1])
+        if lhs < rhs:
+            return False
+        if rhs < lhs:
+            return True
+        self._set_intersection(si1, si2)
+
+    def _compare_less_at_x(self, si1: int, si2: int) -> bool:
+        # si1 is the newly inserted segment; raises _Intersection if the segments cannot be ordered
+        s1 = self.segments[si1]
+        s2 = self.segments[si2]
+        vert1 = s1[0] == s1[2]
+        vert2 = s2[0] == s2[2]
+        if vert1 and vert2:
+            # since entry events are ordered after exit events, this always is an overlap
+            self._set_intersection(si1, si2)
+        if vert1:
+            return self._compare_less_at_x_1vert(si1, si2, s1, s2)
+        if vert2:
+            return not self._compare_less_at_x_1vert(si2, si1, s2, s1)
+        return self._compare_less_at_x_novert(si1, si2, s1, s2)
+
+    def _check_segment_against(self, si1: int, si2: int):
+        res = _do_intersect(self.segments[si1], self.segments[si2])
+        if res:
+            raise _Intersection(si1, si2, res)
+
+    def find_intersection(self) -> _t.Optional[_Intersection]:
+        # Events ordered by point, exit events before entry events at the same point
+        events = [(s[0], s[1], 1, i) for i, s in enumerate(self.segments)]
+        events += [(s[2], s[3], 0, i) for i, s in enumerate(self.segments)]
+        events.sort()
+        active = _SweepLine()
+        try:
+            for (_, _, entering, index) in events:
+                if entering:
+                    below, above = active.insert(index, self._compare_less_at_x)
+                    if below is not None:
+                        self._check_segment_against(index, below)
+                    if above is not None:
+                        self._check_segment_against(index, above)
+                else:
+                    below, above = active.remove(index)
+                    if below is not None and above is not None:
+                        self._check_segment_against(below, above)
+        except _Intersection as intersection:
+            return intersection
+        return None
+
+
+def _to_tuple(segment) -> _t.Tuple[int, int, int, int]:
+    if isinstance(segment, Segment):
+        return segment.s.x, segment.s.y, segment.t.x, segment.t.y
+    if len(segment) == 4:
+        return int(segment[0]), int(segment[1]), int(segment[2]), int(segment[3])
+    (sx, sy), (tx, ty) = segment
+    return int(sx), int(sy), int(tx), int(ty)
+
+
+def _str_segment(s) -> str:
+    return f"({s[0]}, {s[1]})--({s[2]}, {s[3]})"
+
+
+def verify_coloring(segments, coloring: _t.List[int]) -> _t.Tuple[_t.Optional[ColoringError], int]:
+    """
+    Verify a coloring of segments, where coloring[i] is the color of segment[i].
+    Segments can be given as Segment objects, as 4-tuples (s.x, s.y, t.x, t.y) or as
+    2-tuples ((s.x, s.y), (t.x, t.y)). Returns the first error found (or None) and the
+    number of colors used.
+    """
+    prepared = []
+    for segment in segments:
+        sx, sy, tx, ty = _to_tuple(segment)
+        prepared.append((sx, sy, tx, ty) if (sx, sy) < (tx, ty) else (tx, ty, sx, sy))
+
+    if len(prepared) != len(coloring):
+        msg = f"Number of colored segments ({len(coloring)}) does not match number of segments in instance " \
+              f"({len(prepared)})"
+        return ColoringError(_NPOS, _NPOS, _NPOS, float("nan"), float("nan"), msg, False), 0
+
+    color_classes = {}
+    for i, c in enumerate(coloring):
+        color_classes.setdefault(c, []).append(i)
+    num_colors = len(color_classes)
+
+    for c in range(num_colors):
+        color_class = color_classes.get(c, [])
+        intersection = _AnyIntersectionSweep([prepared[i] for i in color_class]).find_intersection()
+        if intersection is not None:
+            i1 = color_class[intersection.segment_index[0]]
+            i2 = color_class[intersection.segment_index[1]]
+            x, y = intersection.approximate_location
+            msg = f"Intersection between segments {i1} ({_str_segment(prepared[i1])}) and " \
+                  f"{i2} ({_str_segment(prepared[i2])}) near ({_fmt(x)}, {_fmt(y)})"
+            return ColoringError(i1, i2, c, x, y, msg, True), num_colors
+    return None, num_colors
@@ -2,8 +2,10 @@
 This file contains the ZipSolutionIterator which can read a zip and return all solutions
 in it. It should be reasonably robust and have some basic security features.
 """
+import collections
 import json
 import typing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from typing import BinaryIO, Union, Dict, Iterator, Optional
 from os import PathLike, path
 from zipfile import ZipFile, BadZipFile
@@ -12,10 +14,53 @@ from json import JSONDecodeError
 import chardet
 
 from ..instance_database import InstanceDatabase
+from ..io.zip_handles import zip_reading_executor, open_zip
 from ..io.solution import process_solution_json
 from .zip_reader_errors import BadZipChecker, NoSolutionsError, InvalidEncodingError, \
     InvalidJSONError, InvalidZipError
 
+DECODE_THREADS = "threads"
+DECODE_PROCESSES = "processes"
+
+
+def _robust_parse_json_from_bytes(bytes):
+    """
+    First tries to encode via 'UTF-8', otherwise it uses chardet.
+    :param bytes: bytes of solution file
+    :return: json
+    """
+    try:
+        return json.loads(str(bytes, encoding="utf-8", errors='strict'))
+    except UnicodeDecodeError as ude:
+        encoding = chardet.detect(bytes)
+        return json.loads(str(bytes, encoding=encoding["encoding"], errors='strict'))
+
+
+def _decode_member(zip_file: ZipFile, file_name: str):
+    """
+    Reads and parses a member of the zip.
+    Errors are returned as (kind, message) instead of raised, so they can be sent
+    back from a worker process and raised in archive order.
+    :return: (json, None) or (None, (kind, message))
+    """
+    info = zip_file.getinfo(file_name)
+    with zip_file.open(file_name, "r") as solution_file:
+        # read no more than the claimed file_size bytes (which we checked for limit violations)
+        b = solution_file.read(info.file_size)
+    try:
+        return _robust_parse_json_from_bytes(b), None
+    except UnicodeDecodeError:
+        return None, ("encoding", None)
+    except JSONDecodeError as e:
+        return None, ("json", f"{e}")
+    except RecursionError:
+        return None, ("json", "Nesting level is too deep")
+
+
+def _decode_member_in_worker(path: str, file_name: str):
+    with open_zip(path) as zip_file:
+        return _decode_member(zip_file, file_name)
+
 
 class ZipSolutionIterator:
     """
@@ -33,6 +78,8 @@ class ZipSolutionIterator:
                  file_size_limit: int = 250 * 1_000_000,
                  zip_size_limit: int = 2000 * 1_000_000,
                  solution_extensions=("json", "solution"),
+                 decode_workers: int = 0,
+                 decode_with: str = DECODE_THREADS,
                  ):
         """
         Set the parameters in the constructor. Use the __call__ to actually iterate
@@ -41,10 +88,19 @@ class ZipSolutionIterator:
         :param file_size_limit: Limit the size of a single file within the zip.
         :param zip_size_limit: Limit the overall decompressed size of the zip.
         :param solution_extensions: What file extensions should be checked?
+        :param decode_workers: Number of threads/processes that read and parse the solution
+                        files (0: parse them one after the other in the calling thread).
+                        Every worker opens the zip itself, so this needs a path to the zip.
+        :param decode_with: DECODE_THREADS or DECODE_PROCESSES. Reading the zip releases the
+                        GIL, parsing the JSON does not.
         """
+        if decode_with not in (DECODE_THREADS, DECODE_PROCESSES):
+            raise ValueError(f"decode_with must be '{DECODE_THREADS}' or '{DECODE_PROCESSES}'")
         self._checker = BadZipChecker(file_size_limit=file_size_limit,
                                       zip_size_limit=zip_size_limit)
         self._solution_extensions = solution_extensions
+        self._decode_workers = decode_workers
+        self._decode_with = decode_with
 
     def _check_if_bad_zip(self, zipfile):
         self._checker(zipfile)
@@ -76,35 +132,48 @@ class ZipSolutionIterator:
         if not had_filename:
             raise NoSolutionsError()
 
-    def _robust_parse_json_from_bytes(self, bytes):
-        """
-        First tries to encode via 'UTF-8', otherwise it uses chardet.
-        :param bytes: bytes of solution file
-        :return: json
-        """
-        try:
-            return json.loads(str(bytes, encoding="utf-8", errors='strict'))
-        except UnicodeDecodeError as ude:
-            encoding = chardet.detect(bytes)
-            return json.loads(str(bytes, encoding=encoding["encoding"], errors='strict'))
-
-    def _parse_file(self, solution_file, file_name, info):
-        # read no more than the claimed file_size bytes (which we checked for limit violations)
-        b = solution_file.read(info.file_size)
-        try:
-            return self._robust_parse_json_from_bytes(b)
-        except UnicodeDecodeError as ude:
-            raise InvalidEncodingError(file_name) from ude
-        except JSONDecodeError as e:
-            raise InvalidJSONError(file_name, f"{e}") from e
-        except RecursionError as re:
-            raise InvalidJSONError(file_name, "Nesting level is too deep") from re
+    def _raise_decode_error(self, file_name, error):
+        kind, message = error
+        if kind == "encoding":
+            raise InvalidEncodingError(file_name)
+        raise InvalidJSONError(file_name, message)
 
     def _iterate_solution_jsons(self, zip_file):
         for file_name in self._iterate_solution_filenames(zip_file):
-            with zip_file.open(file_name, "r") as sol_file:
-                info = zip_file.getinfo(file_name)
-                yield file_name, self._parse_file(sol_file, file_name, info)
+            solution_json, error = _decode_member(zip_file, file_name)
+            if error is not None:
+                self._raise_decode_error(file_name, error)
+            yield file_name, solution_json
+
+    def _decoded(self, entry):
+        file_name, future = entry
+        solution_json, error = future.result()
+        if error is not None:
+            self._raise_decode_error(file_name, error)
+        return file_name, solution_json
+
+    def _iterate_solution_jsons_parallel(self, zip_file):
+        """
+        Reads and parses the solution files in a pool of workers with their own handles
+        of the zip, and yields them in the order of the zip.
+        At most two files per worker are parsed ahead of the consumer.
+        """
+        if not isinstance(zip_file.filename, str):
+            raise ValueError("Decoding in parallel needs the path of the zip file")
+        executor_class = ThreadPoolExecutor if self._decode_with == DECODE_THREADS else ProcessPoolExecutor
+        with zip_reading_executor(executor_class, self._decode_workers) as executor:
+            in_flight = collections.deque()
+            try:
+                for file_name in self._iterate_solution_filenames(zip_file):
+                    in_flight.append((file_name, executor.submit(_decode_member_in_worker, zip_file.filename,
+                                                                 file_name)))
+                    if len(in_flight) >= 2 * self._decode_workers:
+                        yield self._decoded(in_flight.popleft())
+                while in_flight:
+                    yield self._decoded(in_flight.popleft())
+            finally:
+                for _, future in in_flight:
+                    future.cancel()
 
     def __call__(self, path_or_file: Union[BinaryIO, str, PathLike]) \
             -> Iterator[typing.Dict]:
@@ -116,7 +185,11 @@ class ZipSolutionIterator:
         try:
             with ZipFile(path_or_file) as zip_file:
                 self._check_if_bad_zip(zip_file)
-                for file_name, solution_json in self._iterate_solution_jsons(zip_file):
+                if self._decode_workers > 0:
+                    solution_jsons = self._iterate_solution_jsons_parallel(zip_file)
+                else:
+                    solution_jsons = self._iterate_solution_jsons(zip_file)
+                for file_name, solution_json in solution_jsons:
                     meta = {"zip_info": {"zip_file": zip_file.filename,
                                          "file_in_zip": file_name}}
                     solution = process_solution_json(solution_json, meta)
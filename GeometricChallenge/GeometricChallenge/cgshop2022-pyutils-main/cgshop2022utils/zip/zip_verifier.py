@@ -0,0 +1,114 @@
+"""
+This file contains the ZipSolutionVerifier which verifies all solutions in a zip file,
+decoding the zip while earlier solutions are verified in worker processes.
+"""
+import collections
+import os
+import typing
+from concurrent.futures import ProcessPoolExecutor
+from os import PathLike
+from typing import BinaryIO, Union, Iterator, Optional
+
+from ..instance_database import InstanceDatabase
+from ..verify import ColoringError, verify_coloring
+from .zip_processor import ZipSolutionIterator
+
+# The instance database of a worker process
+_worker_database = None
+
+
+def _init_worker(database_path: str, enable_cache: bool):
+    global _worker_database
+    _worker_database = InstanceDatabase(database_path, enable_cache=enable_cache)
+
+
+def _verify_solution(instance_name: str, colors: typing.List[int], expected_num_colors: int):
+    """
+    Verifies a single solution in a worker process.
+    The ColoringError is returned as tuple of its fields, the C++ type cannot be pickled.
+    """
+    error, num_colors = verify_coloring(_worker_database[instance_name], colors, expected_num_colors)
+    if error is None:
+        return None, num_colors
+    return (error.segment_index1, error.segment_index2, error.color_class, error.approximate_x,
+            error.approximate_y, error.message, error.is_intersection), num_colors
+
+
+class ZipSolutionVerifier:
+    """
+    Verifies all solutions in a zip file.
+    The zip is decoded in this process while the solutions are verified in a pool of
+    worker processes, each of which fetches the instances from its own instance database.
+    At most max_in_flight solutions are decoded but not yet returned, so the memory use
+    does not grow with the size of the zip. The zip is checked with the same limits as
+    in ZipSolutionIterator before any solution is decoded.
+    e.g.,
+    ```
+    zsv = ZipSolutionVerifier(InstanceDatabase("./instances"))
+    for solution, error, num_colors in zsv("./myzip.zip"):
+        print(solution["instance"], error, num_colors)
+    ```
+    """
+
+    def __init__(self, instance_database: InstanceDatabase,
+                 processes: Optional[int] = None,
+                 max_in_flight: Optional[int] = None,
+                 file_size_limit: int = 250 * 1_000_000,
+                 zip_size_limit: int = 2000 * 1_000_000,
+                 solution_extensions=("json", "solution"),
+                 enable_cache: bool = False,
+                 ):
+        """
+        Set the parameters in the constructor. Use the __call__ to actually verify
+        a zip file.
+        :param instance_database The database to fetch the instances from (the worker
+                        processes open the same path).
+        :param processes: Number of worker processes (default: number of cores).
+        :param max_in_flight: Maximal number of solutions that are decoded but not yet
+                        returned (default: twice the number of processes).
+        :param file_size_limit: Limit the size of a single file within the zip.
+        :param zip_size_limit: Limit the overall decompressed size of the zip.
+        :param solution_extensions: What file extensions should be checked?
+        :param enable_cache: Should the workers cache the loaded instances? This can take
+                        quite a lot of memory
+        """
+        self._database_path = instance_database.path
+        self._iterator = ZipSolutionIterator(instance_database, file_size_limit=file_size_limit,
+                                             zip_size_limit=zip_size_limit,
+                                             solution_extensions=solution_extensions)
+        self._processes = processes
+        self._max_in_flight = max_in_flight
+        self._enable_cache = enable_cache
+
+    def __call__(self, path_or_file: Union[BinaryIO, str, PathLike]) \
+            -> Iterator[typing.Tuple[typing.Dict, typing.Any, int]]:
+        """
+        Verifies all solutions in the zip.
+        :param path_or_file: Zip or file
+        :return: Iterator over (solution, error, num_colors) in the order of the zip, where
+                error and num_colors are the results of verify.verify_coloring
+        """
+        processes = self._processes or os.cpu_count() or 1
+        with ProcessPoolExecutor(processes, initializer=_init_worker,
+                                 initargs=(self._database_path, self._enable_cache)) as executor:
+            max_in_flight = self._max_in_flight or 2 * processes
+            in_flight = collections.deque()
+            try:
+                for solution in self._iterator(path_or_file):
+                    in_flight.append((solution, executor.submit(_verify_solution, solution["instance"],
+                                                                solution["colors"], solution["num_colors"])))
+                    while len(in_flight) >= max_in_flight:
+                        yield self._result(in_flight.popleft())
+                while in_flight:
+                    yield self._result(in_flight.popleft())
+            finally:
+                for _, future in in_flight:
+                    future.cancel()
+
+    @staticmethod
+    def _result(entry):
+        solution, future = entry
+        error, num_colors = future.result()
+        if error is not None:
+            error = ColoringError(*error)
+        return solution, error, num_colors
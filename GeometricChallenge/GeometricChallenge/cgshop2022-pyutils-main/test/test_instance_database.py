@@ -0,0 +1,149 @@
+from cgshop2022utils import InstanceDatabase
+from cgshop2022utils.instance_database.instance_file_database import InstanceFileDatabase, INDEX_FILE_NAME
+from cgshop2022utils.instance_database import instance_file_database
+from cgshop2022utils.instance_database.instance_cache import estimate_instance_bytes
+from cgshop2022utils.io import read_instance
+from cgshop2022utils.io.zip_handles import zip_reading_executor, open_zip
+from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+import threading
+import zipfile
+import pytest
+from tempfile import TemporaryDirectory
+
+TEST_INSTANCE = os.path.join(os.path.dirname(__file__), 'verifiertests', 'test113.instance.json')
+
+
+def _add_instance(folder, name):
+    os.makedirs(folder, exist_ok=True)
+    shutil.copy(TEST_INSTANCE, os.path.join(folder, f"{name}.instance.json"))
+
+def test_file_database_index_is_persisted():
+    with TemporaryDirectory(suffix="_test_instance_database") as tmpdir:
+        _add_instance(os.path.join(tmpdir, "a", "b"), "first")
+        _add_instance(os.path.join(tmpdir, ".hidden"), "hidden")
+        database = InstanceFileDatabase(tmpdir)
+        assert database["first"]["id"] == "test113"
+        assert os.path.exists(os.path.join(tmpdir, INDEX_FILE_NAME))
+        with pytest.raises(KeyError):
+            database["hidden"]
+
+        reopened = InstanceFileDatabase(tmpdir)
+        assert reopened._load_index()
+        assert reopened._find_path("first") == os.path.join(tmpdir, "a", "b", "first.instance.json")
+
+def test_file_database_index_is_invalidated():
+    with TemporaryDirectory(suffix="_test_instance_database") as tmpdir:
+        _add_instance(os.path.join(tmpdir, "a"), "first")
+        database = InstanceFileDatabase(tmpdir)
+        assert database["first"]["id"] == "test113"
+
+        _add_instance(os.path.join(tmpdir, "a", "new"), "second")
+        assert not InstanceFileDatabase(tmpdir)._load_index()
+        assert database["second"]["id"] == "test113"
+
+        os.remove(os.path.join(tmpdir, "a", "first.instance.json"))
+        with pytest.raises(KeyError):
+            database["first"]
+
+def test_file_database_cache():
+    with TemporaryDirectory(suffix="_test_instance_database") as tmpdir:
+        _add_instance(tmpdir, "first")
+        database = InstanceDatabase(tmpdir, enable_cache=True)
+        instance = database["first"]
+        assert database["first.instance"] is instance
+        assert InstanceDatabase(tmpdir)["first"] is not instance
+
+def test_cache_evicts_least_recently_used():
+    size = estimate_instance_bytes(read_instance(TEST_INSTANCE))
+    with TemporaryDirectory(suffix="_test_instance_database") as tmpdir:
+        for name in ("first", "second", "third"):
+            _add_instance(tmpdir, name)
+        database = InstanceDatabase(tmpdir, enable_cache=True, cache_size_limit=2 * size)
+        first = database["first"]
+        database["second"]
+        assert database["first"] is first  # first is now the most recently used
+        database["third"]  # evicts second
+        assert database["first"] is first
+        assert "second" not in database.cache
+        database["second"]  # evicts third
+        cache = database.cache
+        assert (cache.hits, cache.misses, cache.evictions) == (2, 4, 2)
+        assert len(cache) == 2 and cache.size_bytes == 2 * size
+
+        database = InstanceDatabase(tmpdir, enable_cache=True, cache_size_limit=size - 1)
+        assert database["first"] is not database["first"]  # too large to be cached at all
+        assert len(database.cache) == 0
+
+def test_zip_database_cache():
+    with TemporaryDirectory(suffix="_test_instance_database") as tmpdir:
+        path = os.path.join(tmpdir, "instances.zip")
+        with zipfile.ZipFile(path, "w") as zip_file:
+            zip_file.write(TEST_INSTANCE, "instances/first.instance.json")
+        database = InstanceDatabase(path, enable_cache=True)
+        assert database["first"] is database["first"]
+        assert [instance["id"] for instance in database] == ["test113"]
+        assert (database.cache.hits, database.cache.misses) == (2, 1)
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_prefetch_matches_iteration(use_processes):
+    test_dir = os.path.dirname(TEST_INSTANCE)
+    database = InstanceDatabase(test_dir)
+    expected = [instance["id"] for instance in database]
+    prefetched = [instance["id"] for instance in database.prefetch(prefetch=2, use_processes=use_processes)]
+    assert prefetched == expected
+
+    sizes = {name: os.path.getsize(os.path.join(test_dir, name)) for name in os.listdir(test_dir)
+             if name.endswith(".instance.json")}
+    largest = max(sizes, key=sizes.get)
+    ordered = list(database.prefetch(prefetch=2, largest_first=True, use_processes=use_processes))
+    assert ordered[0]["id"] == read_instance(os.path.join(test_dir, largest))["id"]
+    assert sorted(instance["id"] for instance in ordered) == sorted(expected)
+
+def test_prefetch_zip_uses_cache():
+    with TemporaryDirectory(suffix="_test_instance_database") as tmpdir:
+        path = os.path.join(tmpdir, "instances.zip")
+        with zipfile.ZipFile(path, "w") as zip_file:
+            for name in ("first", "second", "third"):
+                zip_file.write(TEST_INSTANCE, f"instances/{name}.instance.json")
+        database = InstanceDatabase(path, enable_cache=True)
+        second = database["second"]
+        instances = list(database.prefetch(prefetch=2))
+        assert len(instances) == 3 and instances[1] is second
+        assert database["third"] is instances[2]
+
+def test_prefetch_reads_ahead_of_consumer(monkeypatch):
+    prefetch = 2
+    # every read blocks until prefetch + 1 reads are in flight at the same time, which is
+    # only the case if prefetch instances are read ahead of the one handed out first
+    barrier = threading.Barrier(prefetch + 1, timeout=10)
+    read_file = instance_file_database._read_file
+
+    def slow_read_file(path):
+        barrier.wait()
+        return read_file(path)
+
+    monkeypatch.setattr(instance_file_database, "_read_file", slow_read_file)
+    with TemporaryDirectory(suffix="_test_instance_database") as tmpdir:
+        for name in ("first", "second", "third"):
+            _add_instance(tmpdir, name)
+        database = InstanceDatabase(tmpdir)
+        instances = list(database.prefetch(prefetch=prefetch, workers=prefetch + 1))
+        assert len(instances) == 3
+
+def _worker_zip_handle(path):
+    with open_zip(path) as zip_file:
+        return zip_file
+
+def test_zip_reading_executor_closes_handles():
+    with TemporaryDirectory(suffix="_test_instance_database") as tmpdir:
+        path = os.path.join(tmpdir, "instances.zip")
+        with zipfile.ZipFile(path, "w") as zip_file:
+            zip_file.write(TEST_INSTANCE, "instances/first.instance.json")
+        with zip_reading_executor(ThreadPoolExecutor, 2) as executor:
+            handles = [executor.submit(_worker_zip_handle, path).result() for _ in range(4)]
+            assert all(handle.fp is not None for handle in handles)
+        assert all(handle.fp is None for handle in handles)
+        # outside of a worker, the zip is only open while it is used
+        assert _worker_zip_handle(path).fp is None
@@ -0,0 +1,107 @@
+import cgshop2022utils.verify as cgv
+import cgshop2022utils.verify.python_verifier as pyv
+from cgshop2022utils.io import random_instance, read_instance, read_solution
+from random import random, randrange
+import itertools
+import os
+import json
+import pytest
+
+
+def _segment(e):
+    return pyv.Segment(pyv.Point(e[0][0], e[0][1]), pyv.Point(e[1][0], e[1][1])).ordered()
+
+def _random_segments(n, s):
+    segments = []
+    while len(segments) < n:
+        e = ((randrange(s), randrange(s)), (randrange(s), randrange(s)))
+        if e[0] != e[1]:
+            segments.append(e)
+    return segments
+
+def test_python_do_intersect_regression1():
+    s1 = pyv.Segment(pyv.Point(9528, 6418), pyv.Point(8306, 8082)).ordered()
+    s2 = pyv.Segment(pyv.Point(8306, 8082), pyv.Point(9261, 5941)).ordered()
+    assert not pyv.do_intersect(s1, s2)
+    assert not pyv.do_intersect(s2, s1)
+
+def test_python_do_intersect_degenerate():
+    # crossing, touching the interior, collinear overlap, collinear touching, common endpoint
+    assert pyv.do_intersect(_segment(((0, 0), (2, 2))), _segment(((0, 2), (2, 0)))) == [1.0, 1.0]
+    assert pyv.do_intersect(_segment(((0, 0), (2, 0))), _segment(((1, 0), (1, 5)))) == [1.0, 0.0]
+    assert pyv.do_intersect(_segment(((0, 0), (2, 0))), _segment(((1, 0), (3, 0))))
+    assert not pyv.do_intersect(_segment(((0, 0), (1, 0))), _segment(((1, 0), (3, 0))))
+    assert not pyv.do_intersect(_segment(((0, 0), (1, 1))), _segment(((0, 0), (1, 2))))
+
+def test_python_verify_coloring_against_do_intersect():
+    for _ in range(200):
+        segments = _random_segments(20, 6)  # small grid, many degenerate configurations
+        colors = [randrange(3) for _ in segments]
+        error, num_colors = pyv.verify_coloring(segments, colors)
+        assert num_colors == len(set(colors))
+        if error is None:
+            for e1, e2 in itertools.combinations(range(len(segments)), 2):
+                if colors[e1] == colors[e2]:
+                    assert not pyv.do_intersect(_segment(segments[e1]), _segment(segments[e2]))
+        else:
+            assert error.is_intersection
+            assert colors[error.segment_index1] == colors[error.segment_index2] == error.color_class
+            assert pyv.do_intersect(_segment(segments[error.segment_index1]), _segment(segments[error.segment_index2]))
+
+def test_python_sweep_line_blocks(monkeypatch):
+    # tiny blocks, so the sweep line is split into many blocks and blocks run empty
+    monkeypatch.setattr(pyv._SweepLine, "BLOCK_SIZE", 2)
+    test_python_verify_coloring_against_do_intersect()
+    for _ in range(20):
+        # disjoint segments in horizontal bands, many of them cross the sweep line at the same time
+        segments = [((x, 2 * i), (x + randrange(1, 500), 2 * i + 1)) for i, x in
+                    enumerate(randrange(1000) for _ in range(200))]
+        assert pyv.verify_coloring(segments, [0] * len(segments)) == (None, 1)
+        k = randrange(len(segments))
+        crossing = ((segments[k][0][0] - 1, 2 * k - 2), (segments[k][1][0] + 1, 2 * k + 3))
+        error, _ = pyv.verify_coloring(segments + [crossing], [0] * (len(segments) + 1))
+        assert error is not None and error.is_intersection
+
+def test_python_verify_coloring_matches_extension():
+    extension = pytest.importorskip("cgshop2022utils.verify.coloring_verifier")
+    for _ in range(200):
+        segments = _random_segments(30, 8 if random() < 0.5 else 100)
+        colors = [randrange(3) for _ in segments]
+        ext_error, ext_num_colors = extension.verify_coloring(segments, colors)
+        error, num_colors = pyv.verify_coloring(segments, colors)
+        assert num_colors == ext_num_colors
+        assert (error is None) == (ext_error is None)
+
+def test_python_verify_coloring_known_good_and_bad():
+    instance = read_instance(os.path.join(os.path.dirname(__file__), 'verifiertests', 'test113.instance.json'))
+    segments = cgv._to_segments(instance['graph'])
+    for file, expected_error in (('test113.solution.json', False), ('bad113.solution.json', True)):
+        with open(os.path.join(os.path.dirname(__file__), 'verifiertests', file)) as solf:
+            solution = json.load(solf)
+        error, num_colors = pyv.verify_coloring(segments, solution['colors'])
+        assert (error is not None) == expected_error
+        assert num_colors == 11
+
+def test_python_verify_coloring_test_instance():
+    instance = read_instance(os.path.join(os.path.dirname(__file__), 'verifiertests', 'test_verifier.instance.json'))
+    segments = cgv._to_segments(instance['graph'])
+    expected_errors = {'collinear_test_verifier.solution.json': ((-50,0),(0,0)),
+                       'correct_test_verifier.solution.json': None,
+                       'crossing_test_verifier.solution.json': ((-5,-5),)}
+    for file, locations in expected_errors.items():
+        solution = read_solution(os.path.join(os.path.dirname(__file__), 'verifiertests', file))
+        error, num_colors = pyv.verify_coloring(segments, solution['colors'])
+        if locations is None:
+            assert error is None
+            assert num_colors == 6
+        else:
+            assert error.is_intersection
+            assert error.approximate_x in {float(e[0]) for e in locations}
+            assert error.approximate_y in {float(e[1]) for e in locations}
+
+def test_python_verify_coloring_wrong_count():
+    segments = list(random_instance(n=20, p=0.5).edges)
+    error, num_colors = pyv.verify_coloring(segments, [0] * (len(segments) - 1))
+    assert error is not None
+    assert not error.is_intersection
+    assert str(error) == error.message
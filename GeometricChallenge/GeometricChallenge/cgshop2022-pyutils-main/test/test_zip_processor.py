@@ -0,0 +1,56 @@
+from cgshop2022utils import InstanceDatabase, ZipSolutionIterator, InvalidJSONError, FileTooLargeError
+from cgshop2022utils.zip.zip_processor import DECODE_THREADS, DECODE_PROCESSES
+import os
+import pytest
+import zipfile
+from tempfile import TemporaryDirectory
+
+TEST_DIR = os.path.join(os.path.dirname(__file__), 'verifiertests')
+SOLUTIONS = ['test113.solution.json', 'bad113.solution.json', 'correct_test_verifier.solution.json',
+             'crossing_test_verifier.solution.json']
+
+
+def _write_zip(path, files):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for name, data in files:
+            zip_file.writestr(name, data)
+
+def _solution_files():
+    files = []
+    for i in range(6):
+        for source in SOLUTIONS:
+            with open(os.path.join(TEST_DIR, source), 'rb') as f:
+                files.append((f"{i}/{source}", f.read()))
+    return files
+
+@pytest.mark.parametrize("decode_with", [DECODE_THREADS, DECODE_PROCESSES])
+def test_parallel_decoding_keeps_archive_order(decode_with):
+    with TemporaryDirectory(suffix="_test_zip_processor") as tmpdir:
+        path = os.path.join(tmpdir, 'solutions.zip')
+        files = _solution_files()
+        _write_zip(path, files)
+        database = InstanceDatabase(TEST_DIR)
+        serial = list(ZipSolutionIterator(database)(path))
+        parallel = list(ZipSolutionIterator(database, decode_workers=3, decode_with=decode_with)(path))
+    assert [s["meta"]["zip_info"]["file_in_zip"] for s in parallel] == [name for name, _ in files]
+    assert parallel == serial
+
+@pytest.mark.parametrize("decode_with", [DECODE_THREADS, DECODE_PROCESSES])
+def test_parallel_decoding_errors(decode_with):
+    with TemporaryDirectory(suffix="_test_zip_processor") as tmpdir:
+        path = os.path.join(tmpdir, 'solutions.zip')
+        files = _solution_files()
+        files.insert(5, ("broken.solution.json", b'{"type": "Solution_CGSHOP2022", '))
+        _write_zip(path, files)
+        zsi = ZipSolutionIterator(InstanceDatabase(TEST_DIR), decode_workers=2, decode_with=decode_with)
+        solutions = zsi(path)
+        for _ in range(5):
+            next(solutions)
+        with pytest.raises(InvalidJSONError) as error:
+            next(solutions)
+        assert error.value.file_name == "broken.solution.json"
+
+        zsi = ZipSolutionIterator(InstanceDatabase(TEST_DIR), file_size_limit=100, decode_workers=2,
+                                  decode_with=decode_with)
+        with pytest.raises(FileTooLargeError):
+            list(zsi(path))
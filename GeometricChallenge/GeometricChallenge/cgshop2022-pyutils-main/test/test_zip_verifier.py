@@ -0,0 +1,42 @@
+from cgshop2022utils import InstanceDatabase, ZipSolutionVerifier, ZipTooLargeError
+from cgshop2022utils.verify import verify_coloring
+from cgshop2022utils.io import read_instance, read_solution
+import os
+import pytest
+import zipfile
+from tempfile import TemporaryDirectory
+
+TEST_DIR = os.path.join(os.path.dirname(__file__), 'verifiertests')
+
+
+def _write_zip(path, files):
+    with zipfile.ZipFile(path, "w") as zip_file:
+        for name, source in files:
+            zip_file.write(os.path.join(TEST_DIR, source), name)
+
+def test_zip_verifier_matches_verify_coloring():
+    files = [(f"{i}/{source}", source)
+             for i in range(5) for source in ('test113.solution.json', 'bad113.solution.json')]
+    instance = read_instance(os.path.join(TEST_DIR, 'test113.instance.json'))
+    with TemporaryDirectory(suffix="_test_zip_verifier") as tmpdir:
+        path = os.path.join(tmpdir, 'solutions.zip')
+        _write_zip(path, files)
+        zsv = ZipSolutionVerifier(InstanceDatabase(TEST_DIR), processes=2, max_in_flight=3)
+        results = list(zsv(path))
+    assert [solution["meta"]["zip_info"]["file_in_zip"] for solution, _, _ in results] == [name for name, _ in files]
+    for (name, source), (solution, error, num_colors) in zip(files, results):
+        expected_error, expected_num_colors = verify_coloring(instance, read_solution(os.path.join(TEST_DIR, source))["colors"],
+                                                              expected_num_colors=solution["num_colors"])
+        assert num_colors == expected_num_colors
+        assert (error is None) == (expected_error is None)
+        if error is not None:
+            assert error.is_intersection
+            assert error.message == expected_error.message
+
+def test_zip_verifier_size_limit():
+    with TemporaryDirectory(suffix="_test_zip_verifier") as tmpdir:
+        path = os.path.join(tmpdir, 'solutions.zip')
+        _write_zip(path, [('a.solution.json', 'test113.solution.json'), ('b.solution.json', 'bad113.solution.json')])
+        zsv = ZipSolutionVerifier(InstanceDatabase(TEST_DIR), processes=1, zip_size_limit=500)
+        with pytest.raises(ZipTooLargeError):
+            list(zsv(path))
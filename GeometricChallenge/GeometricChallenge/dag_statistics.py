@@ -0,0 +1,151 @@
+from __future__ import annotations
+import collections
+import typing
+import geometry
+
+if typing.TYPE_CHECKING:
+    import dagnode as dag
+    import segment as segclass
+    import vertex as vertclass
+
+VERTEX = geometry.VERTEX
+SEGMENT = geometry.SEGMENT
+TRAPEZOID = geometry.TRAPEZOID
+
+
+# Returns all nodes reachable from root, every shared sub-DAG is visited once
+def reachable_nodes(root: dag.DagNode) -> typing.List[dag.DagNode]:
+    visited = set()
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in visited:
+            continue
+        visited.add(id(node))
+        nodes.append(node)
+        stack.append(node.right_child)
+        stack.append(node.left_child)
+    return nodes
+
+
+# Returns the length of the longest path from root to every node (by id)
+# This is the most steps a query can take to reach the node
+def node_depths(root: dag.DagNode) -> typing.Dict[int, int]:
+    # Iterative post order: children before their parents
+    order = []
+    visited = set()
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+        if node is None or id(node) in visited:
+            continue
+        visited.add(id(node))
+        stack.append((node, True))
+        stack.append((node.right_child, False))
+        stack.append((node.left_child, False))
+
+    # Reverse post order is a topological order
+    depths = {id(root): 0}
+    for node in reversed(order):
+        depth = depths[id(node)] + 1
+        for child in (node.left_child, node.right_child):
+            if child is not None and depths.get(id(child), -1) < depth:
+                depths[id(child)] = depth
+    return depths
+
+
+# Locates endpoint of segment, same search as VerticalDecomposition.point_location_segment
+# Returns the trapezoid node and the number of steps needed to reach it
+def locate_counted(root: dag.DagNode, segment: segclass.Segment, endpoint: vertclass.Vertex) \
+        -> typing.Tuple[dag.DagNode, int]:
+    steps = 0
+    node = root
+    while not node.content.type == TRAPEZOID:
+        node = node.choose_next_segmented(segment, endpoint)
+        steps += 1
+    return node, steps
+
+
+# Number of steps needed to locate endpoint of segment
+def query_path_length(root: dag.DagNode, segment: segclass.Segment, endpoint: vertclass.Vertex) -> int:
+    return locate_counted(root, segment, endpoint)[1]
+
+
+# Statistics of the DAG of a vertical decomposition
+# The query paths are measured for both endpoints of every sample segment
+class DagStatistics:
+    def __init__(self, root: dag.DagNode, samples: typing.Iterable[segclass.Segment] = ()) -> None:
+        nodes = reachable_nodes(root)
+        self.vertices = sum(1 for node in nodes if node.content.type == VERTEX)
+        self.segments = sum(1 for node in nodes if node.content.type == SEGMENT)
+        self.trapezoids = sum(1 for node in nodes if node.content.type == TRAPEZOID)
+
+        # Histogram of the (longest path) depth of the trapezoids
+        depths = node_depths(root)
+        self.depth_histogram = collections.Counter(depths[id(node)] for node in nodes
+                                                   if node.content.type == TRAPEZOID)
+
+        path_lengths = [query_path_length(root, segment, endpoint)
+                        for segment in samples
+                        for endpoint in (segment.endpoint1, segment.endpoint2)]
+        self.queries = len(path_lengths)
+        self.average_path = sum(path_lengths) / len(path_lengths) if path_lengths else 0.0
+        self.worst_path = max(path_lengths, default=0)
+
+    @property
+    def nodes(self) -> int:
+        return self.vertices + self.segments + self.trapezoids
+
+    @property
+    def max_depth(self) -> int:
+        return max(self.depth_histogram, default=0)
+
+    def __str__(self):
+        return f"{self.nodes} nodes ({self.vertices} vertices, {self.segments} segments, {self.trapezoids} trapezoids), " \
+               f"depth {self.max_depth}, query paths over {self.queries} queries: " \
+               f"{self.average_path:.2f} average, {self.worst_path} worst"
+
+
+# Prints how point location cost evolves while the classes of a single pass fill up, and the DAG statistics
+# of the largest classes
+# Usage: python dag_statistics.py <INSTANCE_NAME>
+if __name__ == '__main__':
+    import random
+    import sys
+    from cgshop2022utils.io import read_instance  # Provided by the challenge
+    import gcsolver
+    import vertical_decomposition as vdclass
+
+    instance_name = sys.argv[1] if len(sys.argv) > 1 else "rvisp3499"
+    g = read_instance(f"instances/{instance_name}.instance.json")["graph"]
+    segments, bounding_box = gcsolver.prepare_segments(g)
+    random.seed(0)
+
+    # Path lengths of every query, per class, in insertion order
+    path_lengths = []
+
+    def new_vd():
+        vd = vdclass.VerticalDecomposition(bounding_box)
+        path_lengths.append([])
+        vd.query_hook = path_lengths[-1].append
+        return vd
+
+    vds = gcsolver.decompose_segments(segments, bounding_box, True, new_decomposition=new_vd)[0]
+
+    print(f"{instance_name}: {len(vds)} colours")
+    for colour in range(min(3, len(vds))):
+        lengths = path_lengths[colour]
+        tenth = max(1, -(-len(lengths) // 10))
+        averages = [sum(lengths[i:i + tenth]) / len(lengths[i:i + tenth]) for i in range(0, len(lengths), tenth)]
+        print(f"  colour {colour}: {len(lengths)} queries, average path per tenth of the queries: "
+              + " ".join(f"{average:.1f}" for average in averages))
+
+    sample = random.sample(segments, min(1000, len(segments)))
+    for colour in range(min(3, len(vds))):
+        statistics = vds[colour].statistics(sample)
+        print(f"  colour {colour}: {statistics}")
+        print(f"    depth histogram: {dict(sorted(statistics.depth_histogram.items()))}")
@@ -20,7 +20,9 @@ class DagNode:
         self.content = content
         self.left_child = None
         self.right_child = None
-        self.parents = []
+        # Only trapezoid nodes are ever replaced, so only they keep track of their parents
+        # Other nodes share an empty tuple, which also avoids the parent <-> child reference cycles
+        self.parents = [] if content.type == TRAPEZOID else ()
         self.left_neighbours = set()
         self.right_neighbours = set()
 
@@ -59,24 +61,30 @@ class DagNode:
                 else:
                     return _rchild
 
-    # @TODO: this is a debug method: delete upon release
-    # Find all objects of class
+    # Find all objects of class, every shared sub-DAG is visited once
     def find_all(self, object_class) -> typing.Set[object]:
         output = set()
-        if isinstance(self.content, object_class):
-            output.add(self)
-        if self.left_child is not None:
-            output.update(self.left_child.find_all(object_class))
-        if self.right_child is not None:
-            output.update(self.right_child.find_all(object_class))
+        visited = set()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node is None or id(node) in visited:
+                continue
+            visited.add(id(node))
+            if isinstance(node.content, object_class):
+                output.add(node)
+            stack.append(node.left_child)
+            stack.append(node.right_child)
         return output
 
     # Set left child
     def set_left_child(self, other: 'DagNode') -> None:
         self.left_child = other
-        other.parents.append(self)
+        if other.content.type == TRAPEZOID:
+            other.parents.append(self)
 
     # Set right child
     def set_right_child(self, other: 'DagNode') -> None:
         self.right_child = other
-        other.parents.append(self)
+        if other.content.type == TRAPEZOID:
+            other.parents.append(self)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import typing
+import geometry
+
+if typing.TYPE_CHECKING:
+    import dagnode as dag
+    import segment as segclass
+    import trapezoid as trapclass
+    import vertex as vertclass
+
+VERTEX = geometry.VERTEX
+SEGMENT = geometry.SEGMENT
+TRAPEZOID = geometry.TRAPEZOID
+
+
+# Skips nodes with a single child, the search always continues in that child
+def _resolve(node: dag.DagNode) -> dag.DagNode:
+    while node.content.type != TRAPEZOID and (node.left_child is None or node.right_child is None):
+        node = node.left_child if node.right_child is None else node.right_child
+    return node
+
+
+# Read-only point location structure of a completed vertical decomposition
+# The DAG is flattened into a list of tuples indexed by node number:
+#   (TRAPEZOID, index in trapezoids)
+#   (VERTEX, left child, right child, x)
+#   (SEGMENT, left child, right child, x1, y1, x2, y2)
+# Gives the same answers as the DAG it was built from, without the DagNode objects, parents and neighbour sets
+class FrozenDecomposition:
+    __slots__ = ('nodes', 'trapezoids', 'right_neighbours')
+
+    def __init__(self, root: dag.DagNode) -> None:
+        self.trapezoids: typing.List[trapclass.Trapezoid] = []
+        numbers = {}
+        trapezoid_numbers = {}
+        order = []
+
+        # Number all nodes reachable from the root (shared sub-DAGs only once)
+        stack = [_resolve(root)]
+        while stack:
+            node = stack.pop()
+            if id(node) in numbers:
+                continue
+            numbers[id(node)] = len(order)
+            order.append(node)
+            if node.content.type == TRAPEZOID:
+                trapezoid_numbers[id(node)] = len(self.trapezoids)
+                self.trapezoids.append(node.content)
+            else:
+                stack.append(_resolve(node.right_child))
+                stack.append(_resolve(node.left_child))
+
+        self.nodes: typing.List[tuple] = []
+        for node in order:
+            content = node.content
+            if content.type == TRAPEZOID:
+                self.nodes.append((TRAPEZOID, trapezoid_numbers[id(node)]))
+                continue
+            left = numbers[id(_resolve(node.left_child))]
+            right = numbers[id(_resolve(node.right_child))]
+            if content.type == VERTEX:
+                self.nodes.append((VERTEX, left, right, content.x))
+            else:
+                self.nodes.append((SEGMENT, left, right, content.endpoint1.x, content.endpoint1.y,
+                                   content.endpoint2.x, content.endpoint2.y))
+
+        self.right_neighbours: typing.List[typing.Tuple[int, ...]] = \
+            [tuple(trapezoid_numbers[id(neighbour)] for neighbour in node.right_neighbours
+                   if id(neighbour) in trapezoid_numbers)
+             for node in order if node.content.type == TRAPEZOID]
+
+    # Returns the index of the trapezoid that contains endpoint of segment, same as DagNode.choose_next_segmented
+    def locate(self, segment: segclass.Segment, endpoint: vertclass.Vertex) -> int:
+        nodes = self.nodes
+        px = endpoint.x
+        py = endpoint.y
+
+        node = nodes[0]
+        while True:
+            kind = node[0]
+            if kind == VERTEX:
+                _, lchild, rchild, x = node
+                if px < x:
+                    node = nodes[lchild]
+                elif px > x:
+                    node = nodes[rchild]
+                else:
+                    node = nodes[lchild if segment.endpoint2 is endpoint else rchild]
+            elif kind == SEGMENT:
+                _, lchild, rchild, x1, y1, x2, y2 = node
+                val = (y2 - y1) * (px - x2) - (x2 - x1) * (py - y2)
+                if val == 0:
+                    # point lies on the segment, decide on the other endpoint
+                    other = segment.endpoint1 if endpoint is segment.endpoint2 else segment.endpoint2
+                    val = 1 if (y2 - y1) * (other.x - x2) - (x2 - x1) * (other.y - y2) > 0 else -1
+                node = nodes[lchild if val > 0 else rchild]
+            else:
+                return node[1]
+
+    def point_location_segment(self, segment: segclass.Segment) -> typing.Tuple[int, int]:
+        return self.locate(segment, segment.endpoint1), self.locate(segment, segment.endpoint2)
+
+    # Returns True if segment could be added to the decomposition, same as a (non-empty)
+    # VerticalDecomposition.find_intersecting_trapezoids
+    def can_add_segment(self, segment: segclass.Segment) -> bool:
+        trapezoids = self.trapezoids
+        start, end = self.point_location_segment(segment)
+
+        if not trapezoids[start].is_valid(segment.endpoint1) or not trapezoids[end].is_valid(segment.endpoint2):
+            return False
+
+        current = start
+        while current != end:
+            if not segment.intersects_side(trapezoids[current].right_segment):
+                return False
+
+            for neighbour in self.right_neighbours[current]:
+                if trapezoids[neighbour].segment_enter(segment):
+                    current = neighbour
+                    break
+            else:
+                return False
+
+        return True
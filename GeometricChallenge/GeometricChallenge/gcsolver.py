@@ -1,85 +1,149 @@
-import copy
-import json
-
+from __future__ import annotations
 import typing
 from cgshop2022utils.io import read_instance  # Provided by the challenge
 import random
 import vertical_decomposition as vdclass
 import geometry
 import segment
+import solution_store
+import trapezoid
 import vertex
 
 
+# Builds the segments of all edges (segment i is edge i) and the bounding box of the graph
+# Neither is modified by the decompositions, so they can be reused for every pass over the instance
+# Every node of the graph is a single Vertex, shared by the segments of its edges
+def prepare_segments(g) -> typing.Tuple[typing.List[segment.Segment], trapezoid.Trapezoid]:
+    pool = vertex.VertexPool()
+    segments = [segment.Segment(pool.get(edge[0][0], edge[0][1]), pool.get(edge[1][0], edge[1][1]), index=edgenum)
+                for (edgenum, edge) in enumerate(g.edges)]
+    return segments, geometry.find_bounding_box(g.nodes)
+
+
 # Returns all decompositions, and colours assigned to each segment
-def perform_decompositions(g, shuffle) -> typing.Tuple[typing.List[vdclass.VerticalDecomposition], typing.List[int]]:
-    edges = list(g.edges)
-    indices = list(range(len(edges)))
-    colours = [-1] * len(edges)
+# If more than max_colours decompositions are needed the pass is aborted, and None is returned as colours
+# The decompositions are created with new_decomposition() if it is given, e.g. to set their query_hook
+def decompose_segments(
+        segments: typing.List[segment.Segment],
+        bounding_box: trapezoid.Trapezoid,
+        shuffle,
+        max_colours=None,
+        new_decomposition: typing.Callable[[], vdclass.VerticalDecomposition] | None = None
+) -> typing.Tuple[typing.List[vdclass.VerticalDecomposition], typing.List[int] | None]:
+    if new_decomposition is None:
+        def new_decomposition():
+            return vdclass.VerticalDecomposition(bounding_box)
+
+    indices = list(range(len(segments)))
+    colours = [-1] * len(segments)
     if shuffle:
         random.shuffle(indices)  # Find random reordering of edges to decrease expected running time complexity
 
-    bounding_box = geometry.find_bounding_box(g.nodes)
-    vds = [vdclass.VerticalDecomposition(bounding_box)]
+    vds = [new_decomposition()]
 
     # Process all edges
     for edgenum in indices:
-        edge = edges[edgenum]
-        seg = segment.Segment(vertex.Vertex(edge[0][0], edge[0][1]), vertex.Vertex(edge[1][0], edge[1][1]), index=edgenum)
+        seg = segments[edgenum]
         for (vdnum, vd) in enumerate(vds):
             if vd.add_segment(seg):
                 # If segment can be added to the vertical decomposition of level key: add it and continue to next edge
                 colours[edgenum] = vdnum
                 break
             if vdnum == len(vds) - 1:
+                if max_colours is not None and len(vds) >= max_colours:
+                    # A new VD would exceed the ceiling, this pass can no longer be an improvement
+                    return vds, None
                 # If segment could not be added in any of the existing VDs, create a new VD
                 colours[edgenum] = vdnum+1
-                new = vdclass.VerticalDecomposition(bounding_box)
+                new = new_decomposition()
                 new.add_segment(seg)
                 vds.append(new)
                 break
     return vds, colours
 
 
+# Returns all decompositions, and colours assigned to each segment
+# If more than max_colours decompositions are needed the pass is aborted, and None is returned as colours
+def perform_decompositions(g, shuffle, max_colours=None) \
+        -> typing.Tuple[typing.List[vdclass.VerticalDecomposition], typing.List[int] | None]:
+    segments, bounding_box = prepare_segments(g)
+    return decompose_segments(segments, bounding_box, shuffle, max_colours)
+
+
+# Runs a number of passes over the same segments, every pass has to beat the best colouring found so far
+# Only the decompositions of the current pass and the best colouring are kept alive
+# Returns the best colouring (None if every pass was aborted) and the number of aborted passes
+def run_passes(
+        segments: typing.List[segment.Segment],
+        bounding_box: trapezoid.Trapezoid,
+        passes: int,
+        shuffle=True,
+        max_colours=None
+) -> typing.Tuple[typing.List[int] | None, int]:
+    best_colours = None
+    aborted = 0
+    for _ in range(passes):
+        colours = decompose_segments(segments, bounding_box, shuffle, max_colours)[1]
+        if colours is None:
+            aborted += 1
+        else:
+            best_colours = colours
+            max_colours = max(colours)  # Next pass needs at least one colour less
+    return best_colours, aborted
+
+
+def solution_string(instance_name: str, colours: typing.List[int]) -> str:
+    assert min(colours) >= 0, "Some edges are uncoloured..."
+    num_colours = max(colours) - min(colours) + 1
+
+    return "{\n" \
+           "  \"type\": \"Solution_CGSHOP2022\",\n" \
+           "  \"instance\": \"" + instance_name + "\", \n" \
+           "  \"num_colors\": " + str(num_colours) + ", \n" \
+           "  \"colors\": " + str(colours) + "\n" \
+           "}"
+
+
+# Saves the solution if it is better than the existing solution, returns the solution as json string
+def save_solution(instance_name: str, colours: typing.List[int]) -> str:
+    output_string = solution_string(instance_name, colours)
+    num_colours = max(colours) - min(colours) + 1
+
+    # check if solution is better than existing solution, the store only writes the file if it is
+    saved, score = solution_store.get_store().submit(instance_name, num_colours, output_string)
+    if saved:
+        print(f"{instance_name}: existing solution found with score {score}, worse than new score {num_colours}. Saved!")
+    else:
+        print(f"{instance_name}: existing solution found with score {score}, better than new score {num_colours}. Not saved.")
+
+    return output_string
+
+
 # takes file name outputs json string with solution encoded, no debug info
 # Expected format of file_name "instances/<INSTANCE_NAME>.instance.json"
-def solve(file_name: str, save_to_file=True, shuffle=False) -> str:
+# Returns None if the solution would need more than max_colours colours
+def solve(file_name: str, save_to_file=True, shuffle=False, max_colours=None, passes=1) -> str | None:
     # Incrementally build vertical decompositions of planar subgraphs
     # Read instance and instantiate graph, bounding box and starting vertical decomposition
     instance = read_instance(file_name)  # read edges from input file
     g = instance["graph"]
+    instance_name = file_name.split('.')[0][10:]
 
-    vds, colours = perform_decompositions(g, shuffle)
+    return solve_graph(instance_name, g, save_to_file, shuffle, max_colours, passes)
 
-    # lengths = [colours.count(i) for i in range(max(colours)+1)]
 
-    assert min(colours) >= 0, "Some edges are uncoloured..."
-    num_colours = max(colours) - min(colours) + 1
-    instance_name = file_name.split('.')[0][10:]
+# Same as solve, for a graph that is already loaded (a networkx graph or a shared_instances.SharedGraph)
+# With passes > 1 the instance is only loaded once, and the best of the (shuffled) passes is returned
+def solve_graph(instance_name: str, g, save_to_file=True, shuffle=False, max_colours=None, passes=1) -> str | None:
+    segments, bounding_box = prepare_segments(g)
+    colours, _ = run_passes(segments, bounding_box, passes, shuffle, max_colours)
 
-    output_string = "{\n" \
-                    "  \"type\": \"Solution_CGSHOP2022\",\n" \
-                    "  \"instance\": \"" + instance_name + "\", \n" \
-                    "  \"num_colors\": " + str(num_colours) + ", \n" \
-                    "  \"colors\": " + str(colours) + "\n" \
-                    "}"
+    if colours is None:
+        print(f"{instance_name}: aborted, more than {max_colours} colours needed.")
+        return None
 
-    if save_to_file:
-        # check if solution is better than existing solution
-        score = 1e99
-        try:
-            json_file = open(f"solutions/{instance_name}.solution.json", 'r')
-            data = json.load(json_file)
-            score = data["num_colors"]
-        except Exception as e:
-            # file does not exist
-            pass
-        finally:
-            if num_colours < score:
-                f = open("solutions/" + instance_name + ".solution.json", 'w')
-                f.write(output_string)
-                f.close()
-                print(f"{instance_name}: existing solution found with score {score}, worse than new score {num_colours}. Saved!")
-            else:
-                print(f"{instance_name}: existing solution found with score {score}, better than new score {num_colours}. Not saved.")
+    # lengths = [colours.count(i) for i in range(max(colours)+1)]
 
-    return output_string
+    if save_to_file:
+        return save_solution(instance_name, colours)
+    return solution_string(instance_name, colours)
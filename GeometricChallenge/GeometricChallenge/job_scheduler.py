@@ -0,0 +1,92 @@
+from __future__ import annotations
+import functools
+import json
+import os
+import queue
+import typing
+from multiprocessing import Pool
+
+# Peak memory per segment of a single job, measured with tracemalloc on rvisp3499, rsqrp7320 and sqrp10642
+# Solving is dominated by the DAGs, trapezoids and neighbour sets of the vertical decompositions
+SOLVE_BYTES_PER_SEGMENT = 8000
+# Checking only holds the graph and one Segment per edge
+CHECK_BYTES_PER_SEGMENT = 650
+# Interpreter, networkx and our own modules in every worker
+WORKER_BASE_BYTES = 40 * 1_000_000
+# Share of the available memory that may be used when no budget is given
+DEFAULT_MEMORY_FRACTION = 0.8
+
+
+# Reads the number of edges of an instance file
+@functools.lru_cache(maxsize=None)
+def instance_edge_count(file_name: str) -> int:
+    with open(file_name, 'r') as f:
+        return json.load(f)["m"]
+
+
+# Estimated peak memory (in bytes) of a job on an instance with num_edges edges
+def estimate_job_memory(num_edges: int, bytes_per_segment: int = SOLVE_BYTES_PER_SEGMENT) -> int:
+    return WORKER_BASE_BYTES + num_edges * bytes_per_segment
+
+
+# Memory (in bytes) that can be used without swapping
+def available_memory() -> int:
+    try:
+        with open("/proc/meminfo", 'r') as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+# Number of cores this process is allowed to run on
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Runs function on all jobs in a pool with one worker per core
+# A job is only started while the projected memory of all running jobs fits in memory_budget (in bytes)
+# A job that does not fit in the budget on its own is run when no other job is running
+# Returns the results in the order of jobs
+def run_jobs(
+        function: typing.Callable,
+        jobs: typing.List,
+        job_memory: typing.List[int],
+        memory_budget: int | None = None,
+        processes: int | None = None
+) -> typing.List:
+    if memory_budget is None:
+        memory_budget = int(available_memory() * DEFAULT_MEMORY_FRACTION)
+    if processes is None:
+        processes = available_cores()
+
+    results = [None] * len(jobs)
+    finished = queue.Queue()
+    in_flight = 0
+    in_flight_memory = 0
+
+    with Pool(processes) as p:
+        for (jobnum, job) in enumerate(jobs):
+            # Wait for running jobs to finish until this job fits
+            while in_flight > 0 and (in_flight == processes
+                                     or in_flight_memory + job_memory[jobnum] > memory_budget):
+                done = finished.get()
+                in_flight -= 1
+                in_flight_memory -= job_memory[done]
+
+            results[jobnum] = p.apply_async(function, (job,),
+                                            callback=lambda _, i=jobnum: finished.put(i),
+                                            error_callback=lambda _, i=jobnum: finished.put(i))
+            in_flight += 1
+            in_flight_memory += job_memory[jobnum]
+
+        results = [result.get() for result in results]
+        p.close()
+        p.join()
+
+    return results
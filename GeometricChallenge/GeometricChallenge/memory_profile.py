@@ -0,0 +1,175 @@
+from __future__ import annotations
+import sys
+import typing
+import geometry
+
+if typing.TYPE_CHECKING:
+    import vertical_decomposition as vdclass
+
+TRAPEZOID = geometry.TRAPEZOID
+getsizeof = sys.getsizeof
+
+
+# Size of an object including its attribute dictionary (if it has one)
+def _object_size(obj) -> int:
+    size = getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += getsizeof(obj.__dict__)
+    return size
+
+
+# Memory used by a single vertical decomposition
+# Live nodes are reachable from the root of the DAG, stale nodes are replaced nodes that are still kept in memory
+# through parent lists of other nodes
+# Segments of the instance are shared between decompositions and are not counted
+class DecompositionMemory:
+    def __init__(self) -> None:
+        self.dag_nodes = 0
+        self.trapezoids = 0
+        self.stale_nodes = 0
+        self.parent_entries = 0
+        self.stale_parent_entries = 0
+        self.neighbour_links = 0
+        self.point_entries = 0
+
+        # Estimated bytes per structure
+        self.node_bytes = 0
+        self.parent_bytes = 0
+        self.neighbour_bytes = 0
+        self.trapezoid_bytes = 0
+        self.point_bytes = 0
+        self.wall_bytes = 0
+
+    @property
+    def estimated_bytes(self) -> int:
+        return self.node_bytes + self.parent_bytes + self.neighbour_bytes + self.trapezoid_bytes \
+               + self.point_bytes + self.wall_bytes
+
+    def add(self, other: 'DecompositionMemory') -> None:
+        for key, value in vars(other).items():
+            setattr(self, key, getattr(self, key) + value)
+
+    def __str__(self):
+        return f"{self.dag_nodes} nodes ({self.trapezoids} trapezoids, {self.stale_nodes} stale), " \
+               f"{self.parent_entries} parent entries ({self.stale_parent_entries} stale), " \
+               f"{self.neighbour_links} neighbour links, {self.point_entries} point entries, " \
+               f"~{self.estimated_bytes / 1_000_000:.2f} MB " \
+               f"(nodes {self.node_bytes / 1_000_000:.2f}, parents {self.parent_bytes / 1_000_000:.2f}, " \
+               f"neighbours {self.neighbour_bytes / 1_000_000:.2f}, trapezoids {self.trapezoid_bytes / 1_000_000:.2f}, " \
+               f"points {self.point_bytes / 1_000_000:.2f}, walls {self.wall_bytes / 1_000_000:.2f})"
+
+
+def _account_trapezoid(trapezoid, memory: DecompositionMemory, counted: typing.Set[int]) -> None:
+    memory.trapezoids += 1
+    memory.trapezoid_bytes += _object_size(trapezoid)
+
+    for points in (trapezoid.left_points, trapezoid.right_points):
+        # Trapezoids may share a point set, count every set once
+        if id(points) in counted:
+            continue
+        counted.add(id(points))
+        memory.point_entries += len(points)
+        memory.point_bytes += getsizeof(points)
+        for point in points:
+            # Point sets hold the pooled vertices of the instance (the same Vertex objects as the endpoints of the
+            # segments, and of the sets of other trapezoids), count every vertex once per decomposition
+            if id(point) not in counted:
+                counted.add(id(point))
+                memory.point_bytes += getsizeof(point)
+
+    # Walls are built on first use
+    for wall in (trapezoid._left_segment, trapezoid._right_segment):
+        if wall is not None:
+            memory.wall_bytes += getsizeof(wall) + getsizeof(wall.endpoint1) + getsizeof(wall.endpoint2)
+
+
+# Counts the structures of a vertical decomposition and estimates their size
+def account(vd: vdclass.VerticalDecomposition) -> DecompositionMemory:
+    memory = DecompositionMemory()
+    counted = set()
+
+    if vd.frozen is not None:
+        frozen = vd.frozen
+        memory.dag_nodes = len(frozen.nodes)
+        memory.node_bytes = getsizeof(frozen.nodes) + sum(getsizeof(node) for node in frozen.nodes)
+        memory.neighbour_links = sum(len(neighbours) for neighbours in frozen.right_neighbours)
+        memory.neighbour_bytes = getsizeof(frozen.right_neighbours) \
+            + sum(getsizeof(neighbours) for neighbours in frozen.right_neighbours)
+        for trapezoid in frozen.trapezoids:
+            _account_trapezoid(trapezoid, memory, counted)
+        return memory
+
+    # Live part of the DAG
+    live = set()
+    stack = [vd.dag]
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in live:
+            continue
+        live.add(id(node))
+        stack.append(node.left_child)
+        stack.append(node.right_child)
+
+    # Everything that is kept in memory, following parent lists and neighbour sets as well
+    visited = set()
+    stack = [vd.dag]
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in visited:
+            continue
+        visited.add(id(node))
+
+        memory.dag_nodes += 1
+        memory.node_bytes += _object_size(node)
+        if id(node) not in live:
+            memory.stale_nodes += 1
+
+        memory.parent_entries += len(node.parents)
+        if isinstance(node.parents, list):  # Other nodes share an empty tuple
+            memory.parent_bytes += getsizeof(node.parents)
+        for parent in node.parents:
+            if parent.left_child is not node and parent.right_child is not node:
+                memory.stale_parent_entries += 1
+
+        memory.neighbour_links += len(node.left_neighbours) + len(node.right_neighbours)
+        memory.neighbour_bytes += getsizeof(node.left_neighbours) + getsizeof(node.right_neighbours)
+
+        if node.content.type == TRAPEZOID:
+            _account_trapezoid(node.content, memory, counted)
+
+        stack.append(node.left_child)
+        stack.append(node.right_child)
+        stack.extend(node.parents)
+        stack.extend(node.left_neighbours)
+        stack.extend(node.right_neighbours)
+
+    return memory
+
+
+# Memory profile of all decompositions of a run
+class MemoryProfile:
+    def __init__(self, vds: typing.List[vdclass.VerticalDecomposition]) -> None:
+        self.decompositions = [account(vd) for vd in vds]
+        self.total = DecompositionMemory()
+        for memory in self.decompositions:
+            self.total.add(memory)
+
+    def report(self) -> None:
+        print(f"Memory profile of {len(self.decompositions)} decompositions:")
+        print(f"  total: {self.total}")
+        largest = max(range(len(self.decompositions)), key=lambda i: self.decompositions[i].estimated_bytes)
+        print(f"  largest (colour {largest}): {self.decompositions[largest]}")
+
+
+# Prints the memory profile of a single pass over an instance
+# Usage: python memory_profile.py <INSTANCE_NAME>
+if __name__ == '__main__':
+    import random
+    from cgshop2022utils.io import read_instance  # Provided by the challenge
+    import gcsolver
+
+    instance_name = sys.argv[1] if len(sys.argv) > 1 else "rvisp3499"
+    g = read_instance(f"instances/{instance_name}.instance.json")["graph"]
+    random.seed(0)
+    vds, _ = gcsolver.perform_decompositions(g, True)
+    MemoryProfile(vds).report()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+import math
+import typing
+import geometry
+import segment as segclass
+
+orientation = geometry.orientation
+CW = geometry.CW
+CL = geometry.CL
+
+
+# Returns True if segment lies below the point where other starts, just to the right of that point
+# other is not vertical, segment is in the sweep status so it spans the x-coordinate of the point
+def _below(segment: segclass.Segment, other: segclass.Segment) -> bool:
+    ori = orientation(segment.endpoint1, segment.endpoint2, other.endpoint1)
+    if ori == CL:
+        # other starts on (the line through) segment, decide on the direction of other
+        ori = orientation(segment.endpoint1, segment.endpoint2, other.endpoint2)
+    return ori != CW
+
+
+# Direction of a (non-vertical) segment, equal for segments on parallel lines
+def _direction(segment: segclass.Segment) -> typing.Tuple[int, int]:
+    dx = segment.endpoint2.x - segment.endpoint1.x
+    dy = segment.endpoint2.y - segment.endpoint1.y
+    divisor = math.gcd(dx, dy)
+    return dx // divisor, dy // divisor
+
+
+# Returns the intersecting pairs that a sweep (or a VerticalDecomposition) does not see, only the first one unless
+# find_all is set:
+#   vertical segments (rare in the instances) with all segments that reach their x-coordinate
+#   collinear segments that only touch at a common endpoint, they are never both crossed by the sweep line
+def degenerate_violations(segments: typing.List[segclass.Segment], find_all=False) \
+        -> typing.List[typing.Tuple[segclass.Segment, segclass.Segment]]:
+    violations = []
+    for seg in segments:
+        if seg.endpoint1.x != seg.endpoint2.x:
+            continue
+        x = seg.endpoint1.x
+        for other in segments:
+            if other is not seg and other.endpoint1.x <= x <= other.endpoint2.x and seg.intersects(other) \
+                    and (other.endpoint1.x != other.endpoint2.x or id(seg) < id(other)):
+                violations.append((seg, other))
+                if not find_all:
+                    return violations
+
+    ends = {}
+    for seg in segments:
+        if seg.endpoint1.x != seg.endpoint2.x:
+            ends.setdefault((seg.endpoint2.x, seg.endpoint2.y, _direction(seg)), []).append(seg)
+    for seg in segments:
+        if seg.endpoint1.x != seg.endpoint2.x:
+            for other in ends.get((seg.endpoint1.x, seg.endpoint1.y, _direction(seg)), ()):
+                violations.append((other, seg))
+                if not find_all:
+                    return violations
+    return violations
+
+
+# Returns a pair of intersecting segments (as defined by Segment.intersects), None if there is none
+# Shamos-Hoey sweep: the segments that are crossed by the sweep line are kept ordered from bottom to top, and only
+# segments that become neighbours in that order are tested, O(k log k) tests for k segments
+# (the status is a python list, inserting and removing is a memmove which does not matter in practice)
+def first_violation(segments: typing.List[segclass.Segment]) \
+        -> typing.Tuple[segclass.Segment, segclass.Segment] | None:
+    violations = degenerate_violations(segments)
+    if violations:
+        return violations[0]
+
+    sweep = [i for (i, seg) in enumerate(segments) if seg.endpoint1.x != seg.endpoint2.x]
+    # At every x-coordinate the segments that end there are removed before the segments that start there are added
+    events = [(segments[i].endpoint1.x, 1, i) for i in sweep] + [(segments[i].endpoint2.x, 0, i) for i in sweep]
+    events.sort()
+
+    status = []
+    for (_, start, i) in events:
+        seg = segments[i]
+        if start:
+            low = 0
+            high = len(status)
+            while low < high:
+                middle = (low + high) // 2
+                if _below(status[middle], seg):
+                    low = middle + 1
+                else:
+                    high = middle
+            status.insert(low, seg)
+            if low > 0 and status[low - 1].intersects(seg):
+                return status[low - 1], seg
+            if low + 1 < len(status) and status[low + 1].intersects(seg):
+                return seg, status[low + 1]
+        else:
+            position = status.index(seg)
+            del status[position]
+            if 0 < position < len(status) and status[position - 1].intersects(status[position]):
+                return status[position - 1], status[position]
+    return None
+
+
+# Returns all pairs of intersecting segments
+# Sweeps over x and only tests segments whose x-ranges and y-ranges overlap, this is quadratic if all segments
+# overlap, use first_violation to only find out if a class is valid
+def all_violations(segments: typing.List[segclass.Segment]) \
+        -> typing.List[typing.Tuple[segclass.Segment, segclass.Segment]]:
+    violations = []
+    active = []
+    for seg in sorted(segments, key=lambda s: s.endpoint1.x):
+        x = seg.endpoint1.x
+        low = min(seg.endpoint1.y, seg.endpoint2.y)
+        high = max(seg.endpoint1.y, seg.endpoint2.y)
+        active = [other for other in active if other.endpoint2.x >= x]
+        for other in active:
+            if min(other.endpoint1.y, other.endpoint2.y) <= high and low <= max(other.endpoint1.y, other.endpoint2.y) \
+                    and other.intersects(seg):
+                violations.append((other, seg))
+        active.append(seg)
+    return violations
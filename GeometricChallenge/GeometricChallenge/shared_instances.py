@@ -0,0 +1,77 @@
+from __future__ import annotations
+import contextlib
+import typing
+from multiprocessing import shared_memory
+from cgshop2022utils.io import read_instance  # Provided by the challenge
+
+# Every edge is stored as x1, y1, x2, y2 (64-bit signed integers)
+COORDINATES_PER_EDGE = 4
+BYTES_PER_COORDINATE = 8
+
+
+# Read-only view on the endpoint coordinates in a shared memory block
+# Provides the parts of the networkx graph used by the solver (edges and nodes), without copying the geometry
+class SharedGraph:
+    def __init__(self, coordinates: memoryview, num_edges: int) -> None:
+        self.coordinates = coordinates
+        self.num_edges = num_edges
+
+    @property
+    def edges(self) -> typing.Iterator[typing.Tuple[typing.Tuple[int, int], typing.Tuple[int, int]]]:
+        c = self.coordinates
+        for i in range(0, self.num_edges * COORDINATES_PER_EDGE, COORDINATES_PER_EDGE):
+            yield (c[i], c[i + 1]), (c[i + 2], c[i + 3])
+
+    # Endpoints of the edges, may contain duplicates
+    @property
+    def nodes(self) -> typing.Iterator[typing.Tuple[int, int]]:
+        c = self.coordinates
+        for i in range(0, self.num_edges * COORDINATES_PER_EDGE, 2):
+            yield c[i], c[i + 1]
+
+
+# Handle to an instance in shared memory, small enough to be sent to pool workers
+class SharedInstance:
+    __slots__ = ('name', 'shm_name', 'num_edges')
+
+    def __init__(self, name: str, shm_name: str, num_edges: int) -> None:
+        self.name = name
+        self.shm_name = shm_name
+        self.num_edges = num_edges
+
+    # Attaches to the shared memory block and yields a SharedGraph on it
+    @contextlib.contextmanager
+    def attach(self) -> typing.Iterator[SharedGraph]:
+        shm = shared_memory.SharedMemory(name=self.shm_name)
+        coordinates = shm.buf.cast('q')
+        try:
+            yield SharedGraph(coordinates, self.num_edges)
+        finally:
+            coordinates.release()
+            shm.close()
+
+
+# Loads an instance file into a new shared memory block, edges are stored in the order of the networkx graph
+# The calling process owns the block and has to release it
+def share_instance(file_name: str) -> typing.Tuple[SharedInstance, shared_memory.SharedMemory]:
+    g = read_instance(file_name)["graph"]
+    edges = list(g.edges)
+
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(1, len(edges) * COORDINATES_PER_EDGE * BYTES_PER_COORDINATE))
+    coordinates = shm.buf.cast('q')
+    for (edgenum, edge) in enumerate(edges):
+        i = edgenum * COORDINATES_PER_EDGE
+        coordinates[i], coordinates[i + 1] = edge[0][0], edge[0][1]
+        coordinates[i + 2], coordinates[i + 3] = edge[1][0], edge[1][1]
+    coordinates.release()
+
+    instance_name = file_name.split('/')[-1].split('.')[0]
+    return SharedInstance(instance_name, shm.name, len(edges)), shm
+
+
+# Frees shared memory blocks created by share_instance
+def release(blocks: typing.Iterable[shared_memory.SharedMemory]) -> None:
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
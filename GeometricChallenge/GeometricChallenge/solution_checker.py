@@ -1,18 +1,50 @@
 from cgshop2022utils.io import read_instance  # Provided by the challenge
 
 import geometry
+import job_scheduler
 import segment
+import segment_sweep
 import test_draw
+import verification_cache
 import vertex
+import array
 import json
+import random
+from multiprocessing import Pool, shared_memory
 
 import vertical_decomposition
 
 
+# Ways to check a colour class
+BRUTE_FORCE = "brute_force"  # Test every pair of segments, O(k^2)
+SWEEP = "sweep"  # Plane sweep, O(k log k)
+DECOMPOSITION = "decomposition"  # Insert the segments in a VerticalDecomposition, expected O(k log k)
+METHODS = (BRUTE_FORCE, SWEEP, DECOMPOSITION)
+
+# Values per segment in the shared memory of a parallel check: x1, y1, x2, y2 and the edge index
+SHARED_FIELDS = 5
+# Instances with at least this many edges are checked one at a time, with their classes checked in parallel
+PARALLEL_CLASSES_EDGES = 50000
+
+
+# Checks that no two segments of the same colour intersect
+# By default only the first intersecting pair of every colour class is reported, with all_violations every pair is
+# With a cache (and the hash of the instance file) classes that were proven valid before are not checked again
+# With more than one process the classes are checked in parallel (not from within a pool worker)
 class SolutionCheck:
-    def __init__(self, name, g, colors):
+    def __init__(self, name, g, colors, method=SWEEP, all_violations=False, cache=None, instance_hash=None,
+                 processes=1):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method}, expected one of {METHODS}")
         self.g = g
         self.colors = colors
+        self.method = method
+        self.all_violations = all_violations
+        self.processes = processes
+        self.bounding_box = None
+        self.cache = cache if instance_hash is not None else None
+        self.instance_hash = instance_hash
+        self.cached_classes = 0
         self.subsets = []
         self.errors = []
         self.edges = list(g.edges)
@@ -20,7 +52,10 @@ class SolutionCheck:
         self.check()
         self.name = name
         self.is_correct = all([len(error) == 0 for error in self.errors])
-        print(f"Done checking {name}")
+        if self.cache is not None:
+            print(f"Done checking {name} ({self.cached_classes}/{len(self.subsets)} classes known to be valid)")
+        else:
+            print(f"Done checking {name}")
 
     def report_errors(self):
         print(f"Errors in {self.name}:")
@@ -32,48 +67,186 @@ class SolutionCheck:
                           f"      ({seg1.endpoint1.x},{seg1.endpoint1.y}) -- ({seg1.endpoint2.x},{seg1.endpoint2.y}) "
                           f"and ({seg2.endpoint1.x},{seg2.endpoint1.y}) -- ({seg2.endpoint2.x},{seg2.endpoint2.y})")
 
+    # Buckets the segments by colour in a single pass over the colours
+    # Colours are indices into the subsets, a negative colour would silently put the edge in another class
     def setup(self):
-        for i in range(0, max(self.colors) + 1):
-            cur = []
-            for (j, col) in enumerate(self.colors):
-                if col == i:
-                    a = self.edges[j][0]
-                    b = self.edges[j][1]
-                    cur.append(segment.Segment(vertex.Vertex(a[0], a[1]), vertex.Vertex(b[0], b[1]), index=j))
-
-            self.subsets.append(cur)
+        if any(col < 0 for col in self.colors):
+            raise ValueError(f"Colours must be non-negative, got {min(self.colors)}")
+        pool = vertex.VertexPool()
+        self.subsets = [[] for _ in range(max(self.colors) + 1)]
+        for (j, col) in enumerate(self.colors):
+            a = self.edges[j][0]
+            b = self.edges[j][1]
+            self.subsets[col].append(segment.Segment(pool.get(a[0], a[1]), pool.get(b[0], b[1]), index=j))
 
     def check(self):
-        for (subsetnr, subset) in enumerate(self.subsets):
-            error = []
-            for i in range(len(subset)):
-                for j in range(i + 1, len(subset)):
-                    if subset[i].intersects(subset[j]):
-                        error.append((subset[i], subset[j]))
-            self.errors.append(error)
+        if self.method == DECOMPOSITION:
+            self.bounding_box = geometry.find_bounding_box(self.g.nodes)
+
+        pending = list(range(len(self.subsets)))
+        if self.cache is not None:
+            fingerprints = [verification_cache.class_fingerprint(self.instance_hash, (seg.index for seg in subset))
+                            for subset in self.subsets]
+            known = self.cache.known_valid(fingerprints)
+            pending = [col for col in pending if fingerprints[col] not in known]
+            self.cached_classes = len(self.subsets) - len(pending)
+
+        if self.processes > 1 and len(pending) > 1:
+            results = self.check_parallel(pending)
+        else:
+            results = {col: self.check_subset(self.subsets[col]) for col in pending}
+        self.errors = [results.get(col, []) for col in range(len(self.subsets))]
+
+        if self.cache is not None:
+            self.cache.add_valid([fingerprints[col] for col in pending if not results[col]])
+
+    # Returns the intersecting pairs of segments in subset
+    def check_subset(self, subset):
+        return check_class(subset, self.method, self.all_violations, self.bounding_box)
+
+    # Checks the classes in a pool of worker processes and returns their errors by colour
+    # The endpoints (and edge indices) of the segments are written once to shared memory, grouped by class, and the
+    # classes are handed out from large to small so the largest classes do not end up last
+    def check_parallel(self, pending):
+        coordinates = array.array('q')
+        tasks = []
+        for col in pending:
+            start = len(coordinates) // SHARED_FIELDS
+            for seg in self.subsets[col]:
+                coordinates.extend((seg.endpoint1.x, seg.endpoint1.y, seg.endpoint2.x, seg.endpoint2.y, seg.index))
+            tasks.append((col, start, len(coordinates) // SHARED_FIELDS))
+        tasks.sort(key=lambda task: task[1] - task[2])
+
+        results = {}
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(coordinates) * coordinates.itemsize))
+        try:
+            shm.buf[:len(coordinates) * coordinates.itemsize] = coordinates.tobytes()
+            with Pool(min(self.processes, len(tasks)), initializer=_init_worker,
+                      initargs=(shm.name, self.method, self.all_violations, self.bounding_box)) as p:
+                for (col, pairs) in p.imap_unordered(_check_shared_class, tasks):
+                    by_index = {seg.index: seg for seg in self.subsets[col]}
+                    results[col] = [(by_index[i], by_index[j]) for (i, j) in pairs]
+        finally:
+            shm.close()
+            shm.unlink()
+        return results
+
+
+# Returns the intersecting pairs of segments in subset, see SolutionCheck for the methods
+def check_class(subset, method, all_violations, bounding_box=None):
+    if method == SWEEP:
+        if all_violations:
+            return segment_sweep.all_violations(subset)
+        violation = segment_sweep.first_violation(subset)
+        return [] if violation is None else [violation]
+    if method == DECOMPOSITION:
+        return check_class_decomposition(subset, all_violations, bounding_box)
 
+    error = []
+    for i in range(len(subset)):
+        for j in range(i + 1, len(subset)):
+            if subset[i].intersects(subset[j]):
+                error.append((subset[i], subset[j]))
+                if not all_violations:
+                    return error
+    return error
 
-def check_instance(instance_name):
-    instance = read_instance("instances/" + instance_name + ".instance.json")  # read edges from input file
+
+# Adds the segments (in random order) to a vertical decomposition, every segment that cannot be added is reported
+# with the segment that blocks it
+# With all_violations the segments that cannot be added are only queried once all segments were added, so every
+# segment that was added is seen, and are tested against each other directly: all intersecting pairs are reported,
+# at the cost of a quadratic number of tests in the number of rejected segments (the sweep has the same worst case)
+# Vertical segments and collinear segments that only touch at an endpoint are checked directly, the
+# decomposition does not handle them the same way as Segment.intersects
+def check_class_decomposition(subset, all_violations, bounding_box):
+    error = segment_sweep.degenerate_violations(subset, all_violations)
+    if error and not all_violations:
+        return error
+
+    order = [seg for seg in subset if seg.endpoint1.x != seg.endpoint2.x]
+    random.Random(0).shuffle(order)  # Expected O(k log k) for a random insertion order
+    by_index = {seg.index: seg for seg in subset}
+    vd = vertical_decomposition.VerticalDecomposition(bounding_box)
+    added = []
+    rejected = []
+    for seg in order:
+        if vd.add_segment(seg):
+            added.append(seg)
+        elif all_violations:
+            rejected.append(seg)
+        else:
+            blockers = [by_index[index] for index in vd.find_conflicts(seg, 1)]
+            if not blockers:
+                # Should not happen, find_conflicts uses the same intersection test as the other methods
+                blockers = [other for other in added if other.intersects(seg)][:1]
+            return error + [(blocker, seg) for blocker in blockers]
+
+    # The degenerate pairs may be found again
+    reported = {frozenset((id(a), id(b))) for (a, b) in error}
+    for (i, seg) in enumerate(rejected):
+        blockers = [by_index[index] for index in vd.find_conflicts(seg)]
+        blockers += [other for other in rejected[:i] if other.intersects(seg)]
+        for blocker in blockers:
+            pair = frozenset((id(blocker), id(seg)))
+            if pair not in reported:
+                reported.add(pair)
+                error.append((blocker, seg))
+    return error
+
+
+# State of a worker of SolutionCheck.check_parallel: the shared memory with the segments and the check settings
+_worker = None
+
+
+def _init_worker(shm_name, method, all_violations, bounding_box):
+    global _worker
+    _worker = (shared_memory.SharedMemory(name=shm_name), method, all_violations, bounding_box)
+
+
+# Checks the class stored in [start, end) of the shared memory, returns the colour and the edge indices of the
+# intersecting pairs
+def _check_shared_class(task):
+    col, start, end = task
+    shm, method, all_violations, bounding_box = _worker
+    pool = vertex.VertexPool()
+    subset = []
+    with shm.buf.cast('q') as values:
+        for k in range(start * SHARED_FIELDS, end * SHARED_FIELDS, SHARED_FIELDS):
+            x1, y1, x2, y2, index = values[k:k + SHARED_FIELDS]
+            subset.append(segment.Segment(pool.get(x1, y1), pool.get(x2, y2), index=index))
+    error = check_class(subset, method, all_violations, bounding_box)
+    return col, [(seg1.index, seg2.index) for (seg1, seg2) in error]
+
+
+def check_instance(instance_name, processes=1):
+    instance_file = "instances/" + instance_name + ".instance.json"
+    instance = read_instance(instance_file)  # read edges from input file
     g = instance["graph"]
     solution_file = open("solutions/" + instance_name + ".solution.json", 'r')
     data = json.load(solution_file)
     solution_file.close()
-    return SolutionCheck(instance_name, g, data["colors"])
+    return SolutionCheck(instance_name, g, data["colors"], cache=verification_cache.get_cache(),
+                         instance_hash=verification_cache.instance_hash(instance_file), processes=processes)
 
 if __name__ == "__main__":
     from os import listdir
 
     instance_names = [file.split('.')[0] for file in listdir("solutions/")]
-    from multiprocessing import Pool
+    edge_counts = [job_scheduler.instance_edge_count(f"instances/{name}.instance.json") for name in instance_names]
+
+    # The largest instances dominate the run time, they are checked one at a time with their classes in parallel
+    large = [name for (name, m) in zip(instance_names, edge_counts) if m >= PARALLEL_CLASSES_EDGES]
+    checks = {name: check_instance(name, job_scheduler.available_cores()) for name in large}
 
-    with Pool(14) as p:
-        solution_checks = p.map(check_instance, instance_names)
-        p.close()
-        p.join()
+    small = [(name, m) for (name, m) in zip(instance_names, edge_counts) if m < PARALLEL_CLASSES_EDGES]
+    job_memory = [job_scheduler.estimate_job_memory(m, job_scheduler.CHECK_BYTES_PER_SEGMENT) for (_, m) in small]
+    small_checks = job_scheduler.run_jobs(check_instance, [name for (name, _) in small], job_memory)
+    checks.update(zip([name for (name, _) in small], small_checks))
+    solution_checks = [checks[name] for name in instance_names]
 
     print(f"{len([x for x in solution_checks if x.is_correct])}/{len(instance_names)} correct.")
 
     for solcheck in solution_checks:
         if not solcheck.is_correct:
-            solcheck.report_errors()
\ No newline at end of file
+            solcheck.report_errors()
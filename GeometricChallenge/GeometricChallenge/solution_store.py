@@ -0,0 +1,103 @@
+import contextlib
+import json
+import os
+import sqlite3
+import tempfile
+import typing
+
+
+# Keeps track of the best solution found for every instance.
+# The scores live in a small SQLite index, so processes do not have to parse the (large) solution files to find out
+# whether a new solution is an improvement. Solution files are only written when the score actually improves.
+class SolutionStore:
+    def __init__(self, folder: str = "solutions", index_path: str = "solutions.sqlite") -> None:
+        self.folder = folder
+        self.index_path = index_path
+        # Best scores seen by this process, these can only be stale in the sense that they are too high
+        self.known_scores = {}
+
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS scores (instance TEXT PRIMARY KEY, num_colors INTEGER)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Long timeout: other workers may hold the write lock while they write a solution file
+        return sqlite3.connect(self.index_path, timeout=600, isolation_level=None)
+
+    def solution_path(self, instance_name: str) -> str:
+        return os.path.join(self.folder, f"{instance_name}.solution.json")
+
+    # Reads the score of the solution file on disk, used to seed the index for instances it does not know yet
+    def _read_file_score(self, instance_name: str) -> float:
+        try:
+            with open(self.solution_path(instance_name), 'r') as json_file:
+                return json.load(json_file)["num_colors"]
+        except (OSError, ValueError, KeyError):
+            # file does not exist or is not a valid solution
+            return 1e99
+
+    def _indexed_score(self, connection: sqlite3.Connection, instance_name: str) -> float:
+        row = connection.execute("SELECT num_colors FROM scores WHERE instance = ?", (instance_name,)).fetchone()
+        if row is not None:
+            return row[0]
+
+        score = self._read_file_score(instance_name)
+        if score < 1e99:
+            connection.execute("INSERT OR REPLACE INTO scores VALUES (?, ?)", (instance_name, score))
+        return score
+
+    # Returns the score of the best known solution for the instance (1e99 if there is none)
+    def best_score(self, instance_name: str) -> float:
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            score = self._indexed_score(connection, instance_name)
+            connection.execute("COMMIT")
+        self.known_scores[instance_name] = score
+        return score
+
+    # Replaces the file contents in one step, so readers never see a partially written solution
+    def _write_atomic(self, path: str, contents: str) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(contents)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    # Saves the solution if it uses fewer colours than the best known solution (compare-and-swap on the index)
+    # Returns whether the solution was saved, and the score it was compared against
+    def submit(self, instance_name: str, num_colours: int, output_string: str) -> typing.Tuple[bool, float]:
+        # Cheap rejection: the best score can only have gone down since we last looked
+        known = self.known_scores.get(instance_name, 1e99)
+        if num_colours >= known:
+            return False, known
+
+        with contextlib.closing(self._connect()) as connection:
+            # Holding the write lock makes the read, the file write and the index update a single atomic step
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                score = self._indexed_score(connection, instance_name)
+                saved = num_colours < score
+                if saved:
+                    self._write_atomic(self.solution_path(instance_name), output_string)
+                    connection.execute("INSERT OR REPLACE INTO scores VALUES (?, ?)", (instance_name, num_colours))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        self.known_scores[instance_name] = num_colours if saved else score
+        return saved, score
+
+
+_store = None
+
+
+# Returns the store of this process, pool workers each open their own connection to the shared index
+def get_store() -> SolutionStore:
+    global _store
+    if _store is None:
+        _store = SolutionStore()
+    return _store
@@ -0,0 +1,79 @@
+import random
+import geometry
+import segment as segclass
+import segment_sweep
+import vertex as vertclass
+import vertical_decomposition as vdclass
+
+
+# Segment between two points of the pool, with endpoint1 left of (or below) endpoint2
+def make_segment(pool: vertclass.VertexPool, a, b, index=-1) -> segclass.Segment:
+    if (a[0], a[1]) > (b[0], b[1]):
+        a, b = b, a
+    return segclass.Segment(pool.get(a[0], a[1]), pool.get(b[0], b[1]), index=index)
+
+
+# Builds a decomposition of the segments that can be added, returns it with the added segments
+def build_class(pool: vertclass.VertexPool, edges, size):
+    vd = vdclass.VerticalDecomposition(geometry.find_bounding_box([[0, 0], [size, size]]))
+    added = []
+    for (index, (a, b)) in enumerate(edges):
+        seg = make_segment(pool, a, b, index)
+        if vd.add_segment(seg):
+            added.append(seg)
+    return vd, added
+
+
+def added_by_index(added, index) -> segclass.Segment:
+    return next(seg for seg in added if seg.index == index)
+
+
+# A decomposition allows a segment that continues another one in the same direction, but intersects does not
+def touches_collinear(seg: segclass.Segment, other: segclass.Segment) -> bool:
+    if seg.endpoint1.x == seg.endpoint2.x or other.endpoint1.x == other.endpoint2.x:
+        return False
+    return segment_sweep._direction(seg) == segment_sweep._direction(other) \
+        and (seg.endpoint2 is other.endpoint1 or other.endpoint2 is seg.endpoint1)
+
+
+# Query through the shared vertex (3, 2) of the class segments 0 and 2
+def test_find_conflicts_through_vertex():
+    pool = vertclass.VertexPool()
+    vd, added = build_class(pool, [((3, 2), (5, 2)), ((2, 5), (5, 5)), ((3, 2), (4, 3))], 10)
+    assert len(added) == 3
+    assert sorted(vd.find_conflicts(make_segment(pool, (1, 4), (5, 0)))) == [0, 2]
+
+
+# Compares find_conflicts with testing the query against every segment of the class
+def test_find_conflicts_brute_force(rounds=300, queries=15):
+    rng = random.Random(37)
+    for _ in range(rounds):
+        size = rng.choice((6, 10, 30))
+        pool = vertclass.VertexPool()
+        # The edges of a graph, no duplicates
+        edges = {}
+        while len(edges) < 25:
+            a = (rng.randrange(size), rng.randrange(size))
+            b = (rng.randrange(size), rng.randrange(size))
+            if a != b:
+                edges.setdefault(tuple(sorted((a, b))), (a, b))
+        edges = list(edges.values())
+        vd, added = build_class(pool, edges, size)
+        for _ in range(queries):
+            a = (rng.randrange(size), rng.randrange(size))
+            b = (rng.randrange(size), rng.randrange(size))
+            if a == b:
+                continue
+            query = make_segment(pool, a, b)
+            expected = sorted(other.index for other in added
+                              if other.intersects(query) and not touches_collinear(query, other))
+            found = sorted(index for index in vd.find_conflicts(query)
+                           if not touches_collinear(query, added_by_index(added, index)))
+            assert found == expected, (a, b, [(str(s.endpoint1), str(s.endpoint2)) for s in added])
+            assert vd.find_conflicts(query, 1) == vd.find_conflicts(query)[:1]
+
+
+if __name__ == "__main__":
+    test_find_conflicts_through_vertex()
+    test_find_conflicts_brute_force()
+    print("ok")
@@ -0,0 +1,39 @@
+import random
+import networkx as nx
+import pytest
+import solution_checker as sc
+
+
+# Random graph with distinct edges on a small grid, so many edges share endpoints or are collinear
+def random_graph(rng: random.Random, num_edges: int, size: int) -> nx.Graph:
+    g = nx.Graph()
+    while g.number_of_edges() < num_edges:
+        a = (rng.randrange(size), rng.randrange(size))
+        b = (rng.randrange(size), rng.randrange(size))
+        if a != b:
+            g.add_edge(a, b)
+    return g
+
+
+def violations(check: sc.SolutionCheck):
+    return [sorted(tuple(sorted((a.index, b.index))) for (a, b) in pairs) for pairs in check.errors]
+
+
+# Every method finds a violation in the same classes, with all_violations they all report every intersecting pair
+@pytest.mark.parametrize("method", [sc.SWEEP, sc.DECOMPOSITION])
+def test_methods_match_brute_force(method, rounds=500):
+    rng = random.Random(42)
+    for _ in range(rounds):
+        g = random_graph(rng, rng.randint(2, 10), rng.choice((4, 6, 20)))
+        colors = [rng.randrange(2) for _ in g.edges]
+        brute = violations(sc.SolutionCheck("fuzz", g, colors, sc.BRUTE_FORCE, True))
+        first = violations(sc.SolutionCheck("fuzz", g, colors, method, False))
+        assert [bool(pairs) for pairs in first] == [bool(pairs) for pairs in brute]
+        assert all(set(pairs) <= set(expected) for (pairs, expected) in zip(first, brute))
+        assert violations(sc.SolutionCheck("fuzz", g, colors, method, True)) == brute
+
+
+if __name__ == "__main__":
+    test_methods_match_brute_force(sc.SWEEP)
+    test_methods_match_brute_force(sc.DECOMPOSITION)
+    print("ok")
@@ -0,0 +1,62 @@
+import random
+import geometry
+import segment as segclass
+import vertex as vertclass
+import vertical_decomposition as vdclass
+
+
+# Segment between two points of the pool, with endpoint1 left of (or below) endpoint2
+def make_segment(pool: vertclass.VertexPool, a, b) -> segclass.Segment:
+    if (a[0], a[1]) > (b[0], b[1]):
+        a, b = b, a
+    return segclass.Segment(pool.get(a[0], a[1]), pool.get(b[0], b[1]))
+
+
+def random_edges(rng: random.Random, count: int, size: int):
+    edges = []
+    while len(edges) < count:
+        a = (rng.randrange(size), rng.randrange(size))
+        b = (rng.randrange(size), rng.randrange(size))
+        if a != b:
+            edges.append((a, b))
+    return edges
+
+
+# Trapezoids share their point sets, rolling back has to restore every set to its state at begin()
+def test_rollback_shared_point_sets():
+    pool = vertclass.VertexPool()
+    vd = vdclass.VerticalDecomposition(geometry.find_bounding_box([[0, 0], [5, 5]]))
+    assert vd.add_segment(make_segment(pool, (2, 1), (4, 2)))
+    vd.begin()
+    for (a, b) in [((2, 4), (1, 3)), ((4, 4), (3, 4)), ((3, 4), (0, 0))]:
+        vd.add_segment(make_segment(pool, a, b))
+    vd.rollback()
+    assert vd.add_segment(make_segment(pool, (3, 3), (1, 3)))
+
+
+# A rolled back decomposition accepts and rejects the same segments as one that never saw the transaction
+def test_rollback_matches_no_transaction(rounds=400):
+    rng = random.Random(36)
+    for _ in range(rounds):
+        size = rng.choice((6, 10, 30))
+        pool = vertclass.VertexPool()
+        bounding_box = geometry.find_bounding_box([[0, 0], [size, size]])
+        base, speculative, after = (random_edges(rng, rng.randint(0, 15), size) for _ in range(3))
+
+        vd = vdclass.VerticalDecomposition(bounding_box)
+        reference = vdclass.VerticalDecomposition(bounding_box)
+        for (a, b) in base:
+            assert vd.add_segment(make_segment(pool, a, b)) == reference.add_segment(make_segment(pool, a, b))
+        vd.begin()
+        for (a, b) in speculative:
+            vd.add_segment(make_segment(pool, a, b))
+        vd.rollback()
+        for (a, b) in after:
+            assert vd.can_add_segment(make_segment(pool, a, b)) == reference.can_add_segment(make_segment(pool, a, b))
+            assert vd.add_segment(make_segment(pool, a, b)) == reference.add_segment(make_segment(pool, a, b))
+
+
+if __name__ == "__main__":
+    test_rollback_shared_point_sets()
+    test_rollback_matches_no_transaction()
+    print("ok")
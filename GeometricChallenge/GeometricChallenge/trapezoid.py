@@ -28,29 +28,43 @@ class Trapezoid:
                 else self.bottom_segment.endpoint2
             self.bottom_segment = segclass.Segment(top_vertex, top_vertex)
 
-        # Precompute quad and left/right segments
+        # The walls are only built when they are used, many trapezoids are replaced before that happens
+        self.left_x = self.wall_x(self.left_points, True)
+        self.right_x = self.wall_x(self.right_points, False)
+        self._left_segment = None
+        self._right_segment = None
+
+    # x-coordinate of the left (or right) wall: the x-coordinate of the points on it, if there are none the
+    # trapezoid is bounded by the end of its top or bottom segment
+    def wall_x(self, points: typing.Set[vertclass.Vertex], left: bool):
+        if len(points) > 0:
+            return next(iter(points)).x
+        if left:
+            return max(self.top_segment.endpoint1.x, self.bottom_segment.endpoint1.x)
+        return min(self.top_segment.endpoint2.x, self.bottom_segment.endpoint2.x)
+
+    # Vertical segment at x between the bottom and the top segment
+    def wall(self, x) -> segclass.Segment:
         a = self.top_segment.endpoint1
         b = self.top_segment.endpoint2
         c = self.bottom_segment.endpoint2
         d = self.bottom_segment.endpoint1
 
-        if len(self.left_points) > 0:
-            px = next(iter(self.left_points)).x
-        else:
-            px = max(a.x, d.x)
-        if len(self.right_points) > 0:
-            qx = next(iter(self.right_points)).x
-        else:
-            qx = min(b.x, c.x)
+        top = vertclass.Vertex(x, max(a.y, b.y) if a.x == b.x else (a.y - b.y) / (a.x - b.x) * (x - a.x) + a.y)
+        bot = vertclass.Vertex(x, min(c.y, d.y) if c.x == d.x else (d.y - c.y) / (d.x - c.x) * (x - d.x) + d.y)
+        return segclass.Segment(bot, top)
 
-        p_top = vertclass.Vertex(px, max(a.y, b.y) if a.x == b.x else (a.y - b.y) / (a.x - b.x) * (px - a.x) + a.y)
-        p_bot = vertclass.Vertex(px, min(c.y, d.y) if c.x == d.x else (d.y - c.y) / (d.x - c.x) * (px - d.x) + d.y)
+    @property
+    def left_segment(self) -> segclass.Segment:
+        if self._left_segment is None:
+            self._left_segment = self.wall(self.left_x)
+        return self._left_segment
 
-        q_top = vertclass.Vertex(qx, max(a.y, b.y) if a.x == b.x else (a.y - b.y) / (a.x - b.x) * (qx - a.x) + a.y)
-        q_bot = vertclass.Vertex(qx, min(c.y, d.y) if c.x == d.x else (d.y - c.y) / (d.x - c.x) * (qx - d.x) + d.y)
-
-        self.left_segment = segclass.Segment(p_bot, p_top)
-        self.right_segment = segclass.Segment(q_bot, q_top)
+    @property
+    def right_segment(self) -> segclass.Segment:
+        if self._right_segment is None:
+            self._right_segment = self.wall(self.right_x)
+        return self._right_segment
 
     def __str__(self):
         return f"Left: {self.left_segment} \nRight: {self.right_segment} \nTop: {self.top_segment} \nBot: {self.bottom_segment}"
@@ -60,22 +74,8 @@ class Trapezoid:
 
     def update_left_points(self, new_points: typing.Set[vertclass.Vertex]) -> None:
         self.left_points = new_points
-
-        # Precompute quad and left/right segments
-        a = self.top_segment.endpoint1
-        b = self.top_segment.endpoint2
-        c = self.bottom_segment.endpoint2
-        d = self.bottom_segment.endpoint1
-
-        if len(self.left_points) > 0:
-            px = next(iter(self.left_points)).x
-        else:
-            px = max(a.x, d.x)
-
-        p_top = vertclass.Vertex(px, max(a.y, b.y) if a.x == b.x else (a.y - b.y) / (a.x - b.x) * (px - a.x) + a.y)
-        p_bot = vertclass.Vertex(px, min(c.y, d.y) if c.x == d.x else (d.y - c.y) / (d.x - c.x) * (px - d.x) + d.y)
-
-        self.left_segment = segclass.Segment(p_bot, p_top)
+        self.left_x = self.wall_x(self.left_points, True)
+        self._left_segment = None
 
     # Returns True if the segment crosses top or bottom boundary of this trapezoid
     #         False otherwise
@@ -89,7 +89,7 @@ class Trapezoid:
     def contains(self, point: vertclass.Vertex) -> bool:
         return point.is_above(self.bottom_segment) and \
                point.is_below(self.top_segment) \
-               and self.left_segment.endpoint1.x <= point.x <= self.right_segment.endpoint1.x
+               and self.left_x <= point.x <= self.right_x
 
     def is_valid(self, vertex: vertclass.Vertex) -> bool:
         if (self.top_segment.endpoint1.x == vertex.x and self.top_segment.endpoint1.y == vertex.y) != \
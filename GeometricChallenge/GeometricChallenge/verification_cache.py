@@ -0,0 +1,64 @@
+import contextlib
+import hashlib
+import sqlite3
+import typing
+
+
+# Hash of the contents of an instance file, the edge indices of a solution refer to the edge order in this file
+def instance_hash(file_name: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Fingerprint of a colour class: the instance hash and the sorted indices of the edges in the class
+def class_fingerprint(instance: str, indices: typing.Iterable[int]) -> str:
+    digest = hashlib.sha256(instance.encode())
+    digest.update(",".join(map(str, sorted(indices))).encode())
+    return digest.hexdigest()
+
+
+# Remembers the colour classes that were proven valid, so later runs only check the classes that changed
+# Only valid classes are stored: a class with an intersection is checked again on every run, so its errors can be
+# reported. Like the SolutionStore index this is a small SQLite file, pool workers each open their own connection.
+class VerificationCache:
+    def __init__(self, index_path: str = "verification.sqlite") -> None:
+        self.index_path = index_path
+
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS valid_classes (fingerprint TEXT PRIMARY KEY)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_path, timeout=600, isolation_level=None)
+
+    # Returns the fingerprints that are known to be valid
+    def known_valid(self, fingerprints: typing.List[str]) -> typing.Set[str]:
+        known = set()
+        with contextlib.closing(self._connect()) as connection:
+            # Stay below the SQLite limit on the number of host parameters
+            for start in range(0, len(fingerprints), 500):
+                chunk = fingerprints[start:start + 500]
+                rows = connection.execute(f"SELECT fingerprint FROM valid_classes WHERE fingerprint IN "
+                                          f"({','.join('?' * len(chunk))})", chunk)
+                known.update(row[0] for row in rows)
+        return known
+
+    def add_valid(self, fingerprints: typing.Iterable[str]) -> None:
+        with contextlib.closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany("INSERT OR IGNORE INTO valid_classes VALUES (?)",
+                                   [(fingerprint,) for fingerprint in fingerprints])
+            connection.execute("COMMIT")
+
+
+_cache = None
+
+
+# Returns the cache of this process
+def get_cache() -> VerificationCache:
+    global _cache
+    if _cache is None:
+        _cache = VerificationCache()
+    return _cache
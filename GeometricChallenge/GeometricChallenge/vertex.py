@@ -33,3 +33,18 @@ class Vertex:
     def is_below(self, segment) -> bool:
         return geometry.orientation(segment.endpoint1, segment.endpoint2, self) != geometry.CCW
 
+
+# Gives every point exactly one Vertex, so segments with a common endpoint share the Vertex object
+# Vertices are never changed after they are created, so they can be shared freely
+class VertexPool:
+    def __init__(self) -> None:
+        self.vertices = {}
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def get(self, x, y) -> Vertex:
+        vertex = self.vertices.get((x, y))
+        if vertex is None:
+            vertex = self.vertices[(x, y)] = Vertex(x, y)
+        return vertex
@@ -1,17 +1,59 @@
 from __future__ import annotations
-from copy import deepcopy
+from fractions import Fraction
 import typing
+import dag_statistics
 import dagnode as dag
+import frozen_decomposition
+import geometry
 import trapezoid as trapclass
 import segment as segclass
+import vertex as vertclass
+
+orientation = geometry.orientation
 
 
 # Class that represents the vertical decomposition of a planar graph
 class VerticalDecomposition:
     def __init__(self, bounding_box: trapclass.Trapezoid) -> None:
         self.dag = dag.DagNode(bounding_box)
+        self.bounding_box = bounding_box
+        # Vertical segments do not bound any trapezoid, find_conflicts checks them separately (they are rare)
+        self.vertical_segments = []
+        # Non-vertical segments by endpoint, find_conflicts reports them when segment passes through the endpoint
+        self.segments_at = {}
+        # Read-only query structure that replaces the DAG once the decomposition is frozen
+        self.frozen = None
+        # Optional callable that receives the path length of every point location query that descends the DAG
+        self.query_hook = None
+        # State of the nodes changed since begin() (None if there is no transaction in progress)
+        self.journal = None
+        self.journaled = set()
+        self.journal_root = None
+
+    # Compiles the decomposition into a read-only FrozenDecomposition and drops the DAG
+    # Afterwards segments can no longer be added, but can_add_segment still answers queries
+    def freeze(self) -> None:
+        if self.frozen is None:
+            self.frozen = frozen_decomposition.FrozenDecomposition(self.dag)
+            self.dag = None
+            self.segments_at = None
+
+    # Returns node counts, depth histogram and query path lengths (over both endpoints of the sample segments)
+    def statistics(self, samples: typing.Iterable[segclass.Segment] = ()) -> dag_statistics.DagStatistics:
+        if self.frozen is not None:
+            raise RuntimeError("The DAG of a frozen vertical decomposition has been dropped")
+        return dag_statistics.DagStatistics(self.dag, samples)
+
+    # Returns True if segment does not intersect any segment of this decomposition, without adding it
+    def can_add_segment(self, segment: segclass.Segment) -> bool:
+        if self.frozen is not None:
+            return self.frozen.can_add_segment(segment)
+        return len(self.find_intersecting_trapezoids(segment)) > 0
 
     def point_location_segment(self, segment: segclass.Segment) -> typing.Tuple[dag.DagNode | None, dag.DagNode | None]:
+        if self.query_hook is not None:
+            return self.point_location_segment_recorded(segment)
+
         current_node_1 = self.dag
 
         # geometry.TRAPEZOID = 3
@@ -26,9 +68,23 @@ class VerticalDecomposition:
         # returns point location of left endpoint, point location of right endpoint
         return current_node_1, current_node_2
 
+    # Same as point_location_segment, passes the number of steps of both queries to query_hook
+    def point_location_segment_recorded(self, segment: segclass.Segment) -> typing.Tuple[dag.DagNode, dag.DagNode]:
+        located = []
+        for endpoint in (segment.endpoint1, segment.endpoint2):
+            node, steps = dag_statistics.locate_counted(self.dag, segment, endpoint)
+            self.query_hook(steps)
+            located.append(node)
+        return located[0], located[1]
+
     # Finds all trapezoids intersected by segment (assuming segment does not intersect any existing edges in the VD)
-    def find_intersecting_trapezoids(self, segment: segclass.Segment) -> typing.List[dag.DagNode] | []:
-        start_node, end_node = self.point_location_segment(segment)
+    # The trapezoids of both endpoints can be given if they are already located
+    def find_intersecting_trapezoids(
+            self,
+            segment: segclass.Segment,
+            located: typing.Tuple[dag.DagNode, dag.DagNode] | None = None
+    ) -> typing.List[dag.DagNode] | []:
+        start_node, end_node = self.point_location_segment(segment) if located is None else located
         intersected_trapezoids = [start_node]
         push_trapezoid = intersected_trapezoids.append
         current_node = start_node
@@ -53,20 +109,243 @@ class VerticalDecomposition:
 
         return intersected_trapezoids
 
+    # Returns the indices of the segments of this decomposition that prevent adding segment, from left to right
+    # along segment, at most cap of them (all if cap is None)
+    # Walks the trapezoids along segment, crossing the segments that bound them, a blocking segment is the top
+    # or bottom segment of a trapezoid on the way, or ends on segment at the wall between two trapezoids
+    def find_conflicts(self, segment: segclass.Segment, cap: int | None = None) -> typing.List[int]:
+        if self.frozen is not None:
+            raise RuntimeError("The DAG of a frozen vertical decomposition has been dropped")
+
+        blockers = []
+        reported = set()
+
+        def report(other: segclass.Segment) -> bool:
+            if id(other) not in reported and other.intersects(segment):
+                reported.add(id(other))
+                blockers.append(other.index)
+            return cap is not None and len(blockers) >= cap
+
+        for other in self.vertical_segments:
+            if report(other):
+                return blockers
+
+        p = segment.endpoint1
+        q = segment.endpoint2
+        if p.x == q.x:
+            # The walk needs segment to advance in x, check vertical segments against all segments instead
+            for node in dag_statistics.reachable_nodes(self.dag):
+                if node.content.type == 2 and report(node.content):
+                    break
+            return blockers
+
+        skip = {id(self.bounding_box.top_segment), id(self.bounding_box.bottom_segment)}
+        node = self.dag
+        while not node.content.type == 3:
+            node = node.choose_next_segmented(segment, p)
+        x = p.x
+
+        while True:
+            trapezoid = node.content
+            next_x = trapezoid.right_x
+            next_point = None
+            for boundary in (trapezoid.top_segment, trapezoid.bottom_segment):
+                if boundary.endpoint1 is boundary.endpoint2 or id(boundary) in skip:
+                    continue  # Bounding box, or a vertical segment reduced to a point
+                if report(boundary):
+                    return blockers
+                # Leave the trapezoid where segment crosses its top or bottom, also at the corner with the right
+                # side, the neighbour on the right that segment enters there may lie on the wrong side of boundary
+                crossing = crossing_point(segment, boundary)
+                if crossing is not None and x < Fraction(crossing[0], crossing[2]) <= next_x:
+                    next_x = Fraction(crossing[0], crossing[2])
+                    next_point = crossing
+
+            if next_x >= q.x:
+                return blockers
+            x = next_x
+            # Segment may pass through an endpoint on the wall at x, the segments that end there only bound the
+            # trapezoids on the other side of that endpoint
+            dx = q.x - p.x
+            y = p.y + Fraction((q.y - p.y) * (x - p.x), dx)
+            for other in self.segments_at.get((x, y), ()):
+                if report(other):
+                    return blockers
+            if next_point is None:
+                # Segment leaves through the right side, usually through the interior of a neighbour's left side
+                for neighbour in node.right_neighbours:
+                    if neighbour.content.segment_enter(segment):
+                        node = neighbour
+                        break
+                else:
+                    next_point = (x * dx, p.y * dx + (q.y - p.y) * (x - p.x), dx)
+                if next_point is None:
+                    continue
+
+            node = locate_on_segment(self.dag, segment, *next_point)
+
     # Adds a new segment to the vertical decomposition if it does not intersect
     # Returns True if segment could be inserted in this vertical decomposition
     #         False if segment could not be inserted in this vertical decomposition
     def add_segment(self, segment: segclass.Segment) -> bool:
-        traps = self.find_intersecting_trapezoids(segment)
-
+        if self.frozen is not None:
+            raise RuntimeError("Cannot add segments to a frozen vertical decomposition")
+
+        return self.insert(segment, self.find_intersecting_trapezoids(segment))
+
+    # Adds the segments in the given order, returns for every segment whether it was added
+    # Same as calling add_segment for every segment, but the point location of an endpoint that occurs more than
+    # once in the batch continues from the part of its previous search path that does not depend on the segment
+    def add_segments(self, segments: typing.Iterable[segclass.Segment]) -> typing.List[bool]:
+        if self.frozen is not None:
+            raise RuntimeError("Cannot add segments to a frozen vertical decomposition")
+        if self.query_hook is not None:
+            return [self.add_segment(segment) for segment in segments]
+
+        prefixes = {}
+        locate = self.locate_from_prefix
+        added = []
+        for segment in segments:
+            located = (locate(prefixes, segment, segment.endpoint1, False),
+                       locate(prefixes, segment, segment.endpoint2, True))
+            added.append(self.insert(segment, self.find_intersecting_trapezoids(segment, located)))
+        return added
+
+    # Locates endpoint of segment, starting from the node stored for the endpoint in prefixes
+    # Stores the deepest node on the search path that is reached without a tie at a segment node, the path to it is
+    # the same for every segment that has endpoint on the same side (ties at vertex nodes only depend on the side)
+    # Later insertions only replace trapezoid nodes, so the last node of that path that is not a trapezoid is stored
+    def locate_from_prefix(
+            self,
+            prefixes: typing.Dict[tuple, dag.DagNode],
+            segment: segclass.Segment,
+            endpoint: vertclass.Vertex,
+            right: bool
+    ) -> dag.DagNode:
+        key = (endpoint.x, endpoint.y, right)
+        node = prefixes.get(key, self.dag)
+        prefix = None
+        while not node.content.type == 3:
+            prefix = node
+            content = node.content
+            if content.type == 2 and node.left_child is not None and node.right_child is not None \
+                    and orientation(content.endpoint1, content.endpoint2, endpoint) == 0:
+                break  # Below this node the path depends on the other endpoint of segment
+            node = node.choose_next_segmented(segment, endpoint)
+        if prefix is not None:
+            prefixes[key] = prefix
+
+        while not node.content.type == 3:
+            node = node.choose_next_segmented(segment, endpoint)
+        return node
+
+    # Adds segment to the DAG, given the trapezoids it intersects (none if it cannot be added)
+    def insert(self, segment: segclass.Segment, traps: typing.List[dag.DagNode]) -> bool:
         if len(traps) == 0:
             return False
 
+        if segment.endpoint1.x == segment.endpoint2.x:
+            self.vertical_segments.append(segment)
+        else:
+            for endpoint in (segment.endpoint1, segment.endpoint2):
+                self.segments_at.setdefault((endpoint.x, endpoint.y), []).append(segment)
+
+        if self.journal is not None:
+            self.journal_update(traps)
+            self.journal_root[2].append(segment)
+
         # Add segment to DAG
         self.update(traps, segment)
 
         return True
 
+    # Starts a transaction, the segments added from now on can be removed again with rollback()
+    def begin(self) -> None:
+        if self.frozen is not None:
+            raise RuntimeError("Cannot start a transaction on a frozen vertical decomposition")
+        if self.journal is not None:
+            raise RuntimeError("A transaction is already in progress")
+        self.journal = []
+        self.journaled = set()
+        self.journal_root = (self.dag, len(self.vertical_segments), [])
+
+    # Keeps the segments added since begin()
+    def commit(self) -> None:
+        if self.journal is None:
+            raise RuntimeError("No transaction in progress")
+        self.journal = None
+        self.journaled = set()
+        self.journal_root = None
+
+    # Removes the segments added since begin(), restoring the state of every node the updates changed
+    # Nodes created during the transaction are simply dropped, so this only costs the size of the change
+    # Nodes share point and neighbour sets, a set journaled with a later node may already have been changed, so the
+    # journal is replayed newest first and every set ends up with the state of its oldest snapshot
+    def rollback(self) -> None:
+        if self.journal is None:
+            raise RuntimeError("No transaction in progress")
+        for (node, left_child, right_child, num_parents, left_neighbours, old_left_neighbours,
+             right_neighbours, old_right_neighbours, points) in reversed(self.journal):
+            node.left_child = left_child
+            node.right_child = right_child
+            if num_parents is not None:
+                del node.parents[num_parents:]
+            # Restore the sets in place, the update routines may have handed them to new trapezoids
+            node.left_neighbours = left_neighbours
+            left_neighbours.clear()
+            left_neighbours.update(old_left_neighbours)
+            node.right_neighbours = right_neighbours
+            right_neighbours.clear()
+            right_neighbours.update(old_right_neighbours)
+            if points is not None:
+                left_points, old_left_points, right_points, old_right_points = points
+                node.content.left_points = left_points
+                left_points.clear()
+                left_points.update(old_left_points)
+                node.content.right_points = right_points
+                right_points.clear()
+                right_points.update(old_right_points)
+
+        self.dag, num_vertical, added = self.journal_root
+        del self.vertical_segments[num_vertical:]
+        for segment in reversed(added):
+            if segment.endpoint1.x != segment.endpoint2.x:
+                for endpoint in (segment.endpoint1, segment.endpoint2):
+                    at_endpoint = self.segments_at[(endpoint.x, endpoint.y)]
+                    at_endpoint.pop()
+                    if not at_endpoint:
+                        del self.segments_at[(endpoint.x, endpoint.y)]
+        self.commit()
+
+    # Records the state of node at the start of the transaction (the first time it is changed)
+    def journal_node(self, node: dag.DagNode) -> None:
+        if id(node) in self.journaled:
+            return
+        self.journaled.add(id(node))
+
+        content = node.content
+        if content.type == 3:
+            num_parents = len(node.parents)
+            points = (content.left_points, set(content.left_points), content.right_points, set(content.right_points))
+        else:
+            num_parents = None
+            points = None
+        self.journal.append((node, node.left_child, node.right_child, num_parents,
+                             node.left_neighbours, set(node.left_neighbours),
+                             node.right_neighbours, set(node.right_neighbours), points))
+
+    # The update routines only change the replaced trapezoids, their parents and their neighbours
+    def journal_update(self, nodes: typing.List[dag.DagNode]) -> None:
+        journal_node = self.journal_node
+        for node in nodes:
+            journal_node(node)
+            for other in node.parents:
+                journal_node(other)
+            for other in node.left_neighbours:
+                journal_node(other)
+            for other in node.right_neighbours:
+                journal_node(other)
+
     # Updates the DAG with the new trapezoids induced by adding segment
     def update(self, nodes: typing.List[dag.DagNode], segment: segclass.Segment) -> None:
         if len(nodes) == 1:
@@ -78,23 +357,19 @@ class VerticalDecomposition:
         # Segment is completely contained in a single trapezoid
         node = nodes[0]
         trapezoid = node.content
-        on_trap_left_segment = trapezoid.left_segment.on_segment
-        on_trap_right_segment = trapezoid.right_segment.on_segment
+        on_trap_left_segment = trapezoid.left_x == segment.endpoint1.x
+        on_trap_right_segment = trapezoid.right_x == segment.endpoint2.x
 
-        if not on_trap_left_segment(segment.endpoint1) \
-                and not on_trap_right_segment(segment.endpoint2):
+        if not on_trap_left_segment and not on_trap_right_segment:
             self.update_single_trapezoid_contained(node, trapezoid, segment)
 
-        if on_trap_left_segment(segment.endpoint1) \
-                and not on_trap_right_segment(segment.endpoint2):
+        if on_trap_left_segment and not on_trap_right_segment:
             update_single_trapezoid_left_boundary(node, trapezoid, segment)
 
-        if not on_trap_left_segment(segment.endpoint1) \
-                and on_trap_right_segment(segment.endpoint2):
+        if not on_trap_left_segment and on_trap_right_segment:
             update_single_trapezoid_right_boundary(node, trapezoid, segment)
 
-        if on_trap_left_segment(segment.endpoint1) \
-                and on_trap_right_segment(segment.endpoint2):
+        if on_trap_left_segment and on_trap_right_segment:
             update_single_trapezoid_both_boundary(node, trapezoid, segment)
 
     def update_single_trapezoid_contained(
@@ -180,25 +455,67 @@ class VerticalDecomposition:
         trap_node4.left_neighbours = {trap_node2, trap_node3}
 
 
+# Returns the point where segment crosses other as integers (X, Y, D), the point is (X / D, Y / D) with D > 0
+# Returns None if they do not cross in a single point
+def crossing_point(segment: segclass.Segment, other: segclass.Segment) -> typing.Tuple[int, int, int] | None:
+    p = segment.endpoint1
+    dx = segment.endpoint2.x - p.x
+    dy = segment.endpoint2.y - p.y
+    ex = other.endpoint2.x - other.endpoint1.x
+    ey = other.endpoint2.y - other.endpoint1.y
+    denominator = dx * ey - dy * ex
+    if denominator == 0:
+        return None  # Parallel or collinear
+    numerator = (other.endpoint1.x - p.x) * ey - (other.endpoint1.y - p.y) * ex
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    if not 0 <= numerator <= denominator:
+        return None
+    return p.x * denominator + numerator * dx, p.y * denominator + numerator * dy, denominator
+
+
+# Locates the point (X / D, Y / D) of segment in the DAG without leaving integer arithmetic
+# Ties are broken towards the right endpoint of segment, as DagNode.choose_next_segmented does for a point of
+# segment that is not its right endpoint
+def locate_on_segment(node: dag.DagNode, segment: segclass.Segment, X: int, Y: int, D: int) -> dag.DagNode:
+    while not node.content.type == 3:
+        content = node.content
+        if node.right_child is None:
+            node = node.left_child
+        elif node.left_child is None:
+            node = node.right_child
+        elif content.type == 1:
+            node = node.left_child if X < content.x * D else node.right_child
+        else:
+            a = content.endpoint1
+            b = content.endpoint2
+            val = (b.y - a.y) * (X - b.x * D) - (b.x - a.x) * (Y - b.y * D)
+            if val == 0:
+                # point lies on the segment, decide on the right endpoint
+                val = orientation(a, b, segment.endpoint2)
+            node = node.left_child if val > 0 else node.right_child
+    return node
+
+
 def update_single_trapezoid_left_boundary(
         node: dag.DagNode,
         trapezoid: trapclass.Trapezoid,
         segment: segclass.Segment
 ) -> None:
-    left_points_above_segment = deepcopy({point for point in trapezoid.left_points if point.is_above(segment)})
-    left_points_below_segment = deepcopy({point for point in trapezoid.left_points if point.is_below(segment)})
+    left_points_above_segment = {point for point in trapezoid.left_points if point.is_above(segment)}
+    left_points_below_segment = {point for point in trapezoid.left_points if point.is_below(segment)}
 
     # 1: above segment
     trapezoid1 = trapclass.Trapezoid(trapezoid.top_segment,
                                      left_points_above_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_above_segment,
                                      {segment.endpoint2},
                                      segment)
     # 2: below segment
     trapezoid2 = trapclass.Trapezoid(segment,
                                      left_points_below_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_below_segment,
                                      {segment.endpoint2},
                                      trapezoid.bottom_segment)
@@ -261,8 +578,8 @@ def update_single_trapezoid_right_boundary(
         trapezoid: trapclass.Trapezoid,
         segment: segclass.Segment
 ) -> None:
-    right_points_above_segment = deepcopy({point for point in trapezoid.right_points if point.is_above(segment)})
-    right_points_below_segment = deepcopy({point for point in trapezoid.right_points if point.is_below(segment)})
+    right_points_above_segment = {point for point in trapezoid.right_points if point.is_above(segment)}
+    right_points_below_segment = {point for point in trapezoid.right_points if point.is_below(segment)}
 
     # 1: left of segment
     trapezoid1 = trapclass.Trapezoid(trapezoid.top_segment,
@@ -273,7 +590,7 @@ def update_single_trapezoid_right_boundary(
     trapezoid2 = trapclass.Trapezoid(trapezoid.top_segment,
                                      {segment.endpoint1},
                                      right_points_above_segment.union({segment.endpoint2})
-                                     if trapezoid.right_segment.on_segment(segment.endpoint2)
+                                     if trapezoid.right_x == segment.endpoint2.x
                                      else right_points_above_segment,
                                      segment)
 
@@ -281,7 +598,7 @@ def update_single_trapezoid_right_boundary(
     trapezoid3 = trapclass.Trapezoid(segment,
                                      {segment.endpoint1},
                                      right_points_below_segment.union({segment.endpoint2})
-                                     if trapezoid.right_segment.on_segment(segment.endpoint2)
+                                     if trapezoid.right_x == segment.endpoint2.x
                                      else right_points_below_segment,
                                      trapezoid.bottom_segment)
 
@@ -337,27 +654,27 @@ def update_single_trapezoid_both_boundary(
         trapezoid: trapclass.Trapezoid,
         segment: segclass.Segment
 ) -> None:
-    left_points_above_segment = deepcopy({point for point in trapezoid.left_points if point.is_above(segment)})
-    left_points_below_segment = deepcopy({point for point in trapezoid.left_points if point.is_below(segment)})
-    right_points_above_segment = deepcopy({point for point in trapezoid.right_points if point.is_above(segment)})
-    right_points_below_segment = deepcopy({point for point in trapezoid.right_points if point.is_below(segment)})
+    left_points_above_segment = {point for point in trapezoid.left_points if point.is_above(segment)}
+    left_points_below_segment = {point for point in trapezoid.left_points if point.is_below(segment)}
+    right_points_above_segment = {point for point in trapezoid.right_points if point.is_above(segment)}
+    right_points_below_segment = {point for point in trapezoid.right_points if point.is_below(segment)}
 
     # 1: above segment
     trapezoid1 = trapclass.Trapezoid(trapezoid.top_segment,
                                      left_points_above_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_above_segment,
                                      right_points_above_segment.union({segment.endpoint2})
-                                     if trapezoid.right_segment.on_segment(segment.endpoint2)
+                                     if trapezoid.right_x == segment.endpoint2.x
                                      else right_points_above_segment,
                                      segment)
     # 2: below segment
     trapezoid2 = trapclass.Trapezoid(segment,
                                      left_points_below_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_below_segment,
                                      right_points_below_segment.union({segment.endpoint2})
-                                     if trapezoid.right_segment.on_segment(segment.endpoint2)
+                                     if trapezoid.right_x == segment.endpoint2.x
                                      else right_points_below_segment,
                                      trapezoid.bottom_segment)
 
@@ -439,7 +756,7 @@ def update_multiple_trapezoids_left(
 ) -> typing.Tuple[None | dag.DagNode, None | dag.DagNode]:
     carry, carry_complement = None, None
 
-    if trapezoid.right_segment.on_segment(segment.endpoint1):
+    if trapezoid.right_x == segment.endpoint1.x:
         trapezoid.right_points.add(segment.endpoint1)
 
         for right_neighbour in node.right_neighbours:
@@ -448,7 +765,7 @@ def update_multiple_trapezoids_left(
 
         # Handle case as middle or right, return for now
         return None, None
-    elif trapezoid.left_segment.on_segment(segment.endpoint1):
+    elif trapezoid.left_x == segment.endpoint1.x:
         trapezoid.left_points.add(segment.endpoint1)
 
         for left_neighbour in node.left_neighbours:
@@ -458,8 +775,8 @@ def update_multiple_trapezoids_left(
         # Handle case as middle with left endpoint on left boundary
         return update_multiple_trapezoids_middle(node, trapezoid, segment, carry, carry_complement)
     else:
-        right_points_above_segment = deepcopy({point for point in trapezoid.right_points if point.is_above(segment)})
-        right_points_below_segment = deepcopy({point for point in trapezoid.right_points if point.is_below(segment)})
+        right_points_above_segment = {point for point in trapezoid.right_points if point.is_above(segment)}
+        right_points_below_segment = {point for point in trapezoid.right_points if point.is_below(segment)}
 
         # 1: left of segment
         trapezoid1 = trapclass.Trapezoid(trapezoid.top_segment,
@@ -533,13 +850,13 @@ def update_multiple_trapezoids_right(
         carry: None | dag.DagNode,
         carry_complement: None | dag.DagNode
 ) -> None:
-    if trapezoid.left_segment.on_segment(segment.endpoint2):
+    if trapezoid.left_x == segment.endpoint2.x:
         trapezoid.left_points.add(segment.endpoint2)
 
-    if trapezoid.right_segment.on_segment(segment.endpoint2):
+    if trapezoid.right_x == segment.endpoint2.x:
         update_multiple_trapezoids_right_boundary(node, trapezoid, segment, carry, carry_complement)
 
-    if not trapezoid.right_segment.on_segment(segment.endpoint2):
+    if not trapezoid.right_x == segment.endpoint2.x:
         update_multiple_trapezoids_right_not_boundary(node, trapezoid, segment, carry, carry_complement)
 
 
@@ -550,27 +867,27 @@ def update_multiple_trapezoids_right_boundary(
         carry: None | dag.DagNode,
         carry_complement: None | dag.DagNode
 ) -> None:
-    left_points_above_segment = deepcopy({point for point in trapezoid.left_points if point.is_above(segment)})
-    left_points_below_segment = deepcopy({point for point in trapezoid.left_points if point.is_below(segment)})
-    right_points_above_segment = deepcopy({point for point in trapezoid.right_points if point.is_above(segment)})
-    right_points_below_segment = deepcopy({point for point in trapezoid.right_points if point.is_below(segment)})
+    left_points_above_segment = {point for point in trapezoid.left_points if point.is_above(segment)}
+    left_points_below_segment = {point for point in trapezoid.left_points if point.is_below(segment)}
+    right_points_above_segment = {point for point in trapezoid.right_points if point.is_above(segment)}
+    right_points_below_segment = {point for point in trapezoid.right_points if point.is_below(segment)}
 
     # 1: above segment
     trapezoid1 = trapclass.Trapezoid(trapezoid.top_segment,
                                      left_points_above_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_above_segment,
                                      right_points_above_segment.union({segment.endpoint2})
-                                     if trapezoid.right_segment.on_segment(segment.endpoint2)
+                                     if trapezoid.right_x == segment.endpoint2.x
                                      else right_points_above_segment,
                                      segment)
     # 2: below segment
     trapezoid2 = trapclass.Trapezoid(segment,
                                      left_points_below_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_below_segment,
                                      right_points_below_segment.union({segment.endpoint2})
-                                     if trapezoid.right_segment.on_segment(segment.endpoint2)
+                                     if trapezoid.right_x == segment.endpoint2.x
                                      else right_points_below_segment,
                                      trapezoid.bottom_segment)
 
@@ -660,20 +977,20 @@ def update_multiple_trapezoids_right_not_boundary(
         carry: None | dag.DagNode,
         carry_complement: None | dag.DagNode
 ) -> None:
-    left_points_above_segment = deepcopy({point for point in trapezoid.left_points if point.is_above(segment)})
-    left_points_below_segment = deepcopy({point for point in trapezoid.left_points if point.is_below(segment)})
+    left_points_above_segment = {point for point in trapezoid.left_points if point.is_above(segment)}
+    left_points_below_segment = {point for point in trapezoid.left_points if point.is_below(segment)}
 
     # 1: above segment
     trapezoid1 = trapclass.Trapezoid(trapezoid.top_segment,
                                      left_points_above_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_above_segment,
                                      {segment.endpoint2},
                                      segment)
     # 2: below segment
     trapezoid2 = trapclass.Trapezoid(segment,
                                      left_points_below_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_below_segment,
                                      {segment.endpoint2},
                                      trapezoid.bottom_segment)
@@ -764,27 +1081,27 @@ def update_multiple_trapezoids_middle(
         carry: None | dag.DagNode,
         carry_complement: None | dag.DagNode
 ) -> typing.Tuple[None | dag.DagNode, None | dag.DagNode]:
-    left_points_above_segment = deepcopy({point for point in trapezoid.left_points if point.is_above(segment)})
-    left_points_below_segment = deepcopy({point for point in trapezoid.left_points if point.is_below(segment)})
-    right_points_above_segment = deepcopy({point for point in trapezoid.right_points if point.is_above(segment)})
-    right_points_below_segment = deepcopy({point for point in trapezoid.right_points if point.is_below(segment)})
+    left_points_above_segment = {point for point in trapezoid.left_points if point.is_above(segment)}
+    left_points_below_segment = {point for point in trapezoid.left_points if point.is_below(segment)}
+    right_points_above_segment = {point for point in trapezoid.right_points if point.is_above(segment)}
+    right_points_below_segment = {point for point in trapezoid.right_points if point.is_below(segment)}
 
     # 1: above segment
     trapezoid1 = trapclass.Trapezoid(trapezoid.top_segment,
                                      left_points_above_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_above_segment,
                                      right_points_above_segment.union({segment.endpoint2})
-                                     if trapezoid.right_segment.on_segment(segment.endpoint2)
+                                     if trapezoid.right_x == segment.endpoint2.x
                                      else right_points_above_segment,
                                      segment)
     # 2: below segment
     trapezoid2 = trapclass.Trapezoid(segment,
                                      left_points_below_segment.union({segment.endpoint1})
-                                     if trapezoid.left_segment.on_segment(segment.endpoint1)
+                                     if trapezoid.left_x == segment.endpoint1.x
                                      else left_points_below_segment,
                                      right_points_below_segment.union({segment.endpoint2})
-                                     if trapezoid.right_segment.on_segment(segment.endpoint2)
+                                     if trapezoid.right_x == segment.endpoint2.x
                                      else right_points_below_segment,
                                      trapezoid.bottom_segment)
 